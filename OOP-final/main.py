@@ -108,6 +108,13 @@ def main():
     for i, batch in enumerate(batches_2):
         print(i, batch)
 
+    # Showcasing a BatchLoader that reads batches from a lazy dataset
+    batch_loader_3 = BatchLoader(data=lazy_dataset, shuffle=True, batch_size=8)
+
+    print("Lazy dataset batches:\n")
+    for i, batch in enumerate(batch_loader_3):
+        print(i, [label for _, label in batch])
+
     # showcasing the image processing pipeline
     image_dataset = ClassificationDataset(
         data_path="chess_data",
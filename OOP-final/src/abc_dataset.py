@@ -1,17 +1,52 @@
+import asyncio
 import os
 import random
 import sys
+import time
 from abc import ABC, abstractmethod
-from copy import deepcopy
-from typing import List, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from copy import copy, deepcopy
+from typing import AsyncIterator, Iterator, List, Sequence, Tuple
 
 import librosa
 import numpy as np
 import pandas as pd
 from PIL import Image
 
+from caching import DiskCache, MemoryCache
+from directory_scanner import iter_supported_files
+from metadata import load_metadata, read_metadata, save_metadata
+from ragged_array import RaggedArray
+
 sys.path.append(os.getcwd() + "/src/")
 
+# decoder of a process worker, set once per worker by _init_decoder so that
+# it is not pickled again for every chunk of files
+_worker_decoder = None
+
+
+def _init_decoder(decoder: "Dataset") -> None:
+    """Store the decoder in a process worker.
+
+    Args:
+        decoder (Dataset): A dataset without data, see Dataset._decoder.
+    """
+    global _worker_decoder
+    _worker_decoder = decoder
+
+
+def _decode_in_worker(filename: str) -> np.array:
+    """Reads a datapoint in a process worker.
+
+    Args:
+        filename (str): Path to the datapoint.
+
+    Returns:
+        np.array: Datapoint which is loaded to memory.
+    """
+    return _worker_decoder._read_data_point(filename)
+
 
 class AbstractDataset(ABC):
     """An abstract class for all Datasets that sets the structure how\
@@ -56,9 +91,39 @@ class Dataset(AbstractDataset):
         _data_type (str): Type of data (e.g., "image", "audio").
         _labels_bool (bool): Indicates if the dataset has labels.
         lazy (bool): Lazy loading flag.
+        zero_copy (bool): If True, __getitem__ returns read-only views\
+            instead of deep copies.
         _csv_path (str): Path to the CSV file containing labels.
+        _num_workers (int): Number of workers used to decode files when\
+            the dataset is loaded eagerly.
+        _executor (str): Kind of worker pool, "thread" or "process".
+        _load_stats (dict): Number of decoded files and the time it took.
+        _disk_cache (DiskCache): Persistent cache of decoded datapoints,\
+            None if no cache_dir is given.
+        _memory_cache (MemoryCache): In-memory cache of lazily loaded\
+            datapoints, None if no memory_cache_bytes is given.
+        _decode_hints (dict): Preprocessing steps that are applied while\
+            decoding, set by a preprocessing pipeline on a lazy dataset.
+        _sample_rate (int | str): Sampling rate audio is loaded at, or\
+            "native" to keep the rate of the file.
+        _filepaths (List[str]): Source files of the datapoints.
+        _metadata (dict): Header metadata of the source files, once it is\
+            read by metadata().
+        _csv_chunksize (int): Number of csv rows parsed at a time.
+        _csv_label_dtype (type): dtype the label column of a csv file is\
+            parsed as, None to infer it.
+        _contiguous (bool): Whether eager images are stored in a single\
+            (N, H, W, C) array or a RaggedArray instead of a list.
+        _max_memory_bytes (int): Memory budget of an eager dataset. Samples\
+            that do not fit stay paths and are decoded on access.
+        _max_concurrency (int): Number of datapoints the async API reads\
+            at the same time.
+        _async_executor (ThreadPoolExecutor): Threads of the async API,\
+            created on first use.
     """
 
+    _csv_label_dtype = None
+
     def __init__(
         self,
         data_path: str,
@@ -66,13 +131,69 @@ class Dataset(AbstractDataset):
         labels: bool = False,
         csv_path: str = None,
         lazy: bool = False,
+        num_workers: int = 1,
+        executor: str = "thread",
+        cache_dir: str = None,
+        cache_max_bytes: int = None,
+        memory_cache_bytes: int = None,
+        zero_copy: bool = False,
+        sample_rate: int | str = 22050,
+        csv_chunksize: int = 100000,
+        contiguous: bool = False,
+        max_memory_bytes: int = None,
+        max_concurrency: int = 8,
     ) -> None:
         super().__init__(data_path=data_path)
+        if num_workers < 1:
+            raise TypeError("num_workers has to be at least 1.")
+        if sample_rate != "native" and (
+            not isinstance(sample_rate, int) or sample_rate <= 0
+        ):
+            raise TypeError(
+                "sample_rate has to be a positive int or 'native'."
+            )
+        if executor not in ["thread", "process"]:
+            raise NameError("executor has to be one of 'thread' or 'process'")
+        if csv_chunksize < 1:
+            raise TypeError("csv_chunksize has to be at least 1.")
+        if contiguous is True and (lazy is True or data_type != "image"):
+            raise TypeError("contiguous needs an eager image dataset.")
+        if max_concurrency < 1:
+            raise TypeError("max_concurrency has to be at least 1.")
+        if max_memory_bytes is not None and max_memory_bytes < 0:
+            raise TypeError("max_memory_bytes has to be positive.")
+        if max_memory_bytes is not None and contiguous is True:
+            raise TypeError(
+                "contiguous can't be combined with max_memory_bytes."
+            )
         self._data_type = data_type
         self._labels_bool = labels
         self.lazy = lazy
+        self.zero_copy = zero_copy
 
         self._csv_path = csv_path
+        self._num_workers = num_workers
+        self._executor = executor
+        self._load_stats = {"files": 0, "seconds": 0.0}
+        self._disk_cache = (
+            DiskCache(cache_dir, cache_max_bytes)
+            if cache_dir is not None
+            else None
+        )
+        self._memory_cache = (
+            MemoryCache(memory_cache_bytes)
+            if memory_cache_bytes is not None
+            else None
+        )
+        self._decode_hints = {}
+        self._sample_rate = sample_rate
+        self._csv_chunksize = csv_chunksize
+        self._contiguous = contiguous
+        self._max_memory_bytes = max_memory_bytes
+        self._max_concurrency = max_concurrency
+        self._async_executor = None
+        self._filepaths = []
+        self._metadata = None
 
     def __repr__(self) -> str:
         """__repr__() defines the string representation of the given object.
@@ -111,9 +232,16 @@ class Dataset(AbstractDataset):
             tuple: outputs tuple of the form (data[index], label) if labels is\
             set to True\n
             during the initialisation of the dataset, (data[index]) if labels\
-            is set to False.
+            is set to False. With zero_copy set to True the arrays are\
+            read-only views of the stored data.
 
         """
+        if self.zero_copy is True:
+            data_point = self._read_only(self._if_lazy(self.data[index]))
+            if self._labels_bool is False:
+                return data_point
+            return (data_point, self._read_only(self.labels[index]))
+
         if self._labels_bool is False:
             return deepcopy(self._if_lazy(self.data[index]))
         else:
@@ -122,6 +250,230 @@ class Dataset(AbstractDataset):
                 deepcopy(self.labels[index]),
             )
 
+    def get_batch(self, indices: Sequence[int]) -> list:
+        """Batched version of __getitem__. The files of the batch are read\
+            sorted by path, so reads that are close on disk follow each\
+            other, and put back into the order of indices. Only the\
+            datapoints of the batch are decoded, so a BatchLoader over a\
+            lazy dataset needs memory for one batch. A batch is decoded in\
+            the calling thread; to decode batches in parallel give the\
+            BatchLoader workers.
+
+        use case:
+            loader = BatchLoader(dataset, batch_size=32, shuffle=True)
+
+        Args:
+            indices (Sequence[int]): Indices of the datapoints.
+
+        Returns:
+            list: Outputs of __getitem__, in the order of indices.
+        """
+        items = [self.data[index] for index in indices]
+        decoded, fresh = self._read_batch_paths(
+            sorted({item for item in items if isinstance(item, str)})
+        )
+        batch = []
+        for index, item in zip(indices, items):
+            if isinstance(item, str):
+                data_point = decoded[item]
+                # a datapoint decoded for this batch alone needs no copy
+                owned = item in fresh
+                fresh.discard(item)
+            else:
+                data_point, owned = item, False
+            if self.zero_copy is True:
+                data_point = self._read_only(data_point)
+            elif owned is False:
+                data_point = deepcopy(data_point)
+            if self._labels_bool is False:
+                batch.append(data_point)
+            elif self.zero_copy is True:
+                batch.append((data_point, self._read_only(self.labels[index])))
+            else:
+                batch.append((data_point, deepcopy(self.labels[index])))
+        return batch
+
+    def _read_batch_paths(self, paths: List[str]) -> Tuple[dict, set]:
+        """Reads the files of a batch, from the in-memory cache if they are\
+            there and from the disk cache or the files otherwise. A worker\
+            pool per batch would cost more than it saves, so the files are\
+            read one after the other.
+
+        Args:
+            paths (List[str]): Sorted, unique paths of the batch.
+
+        Returns:
+            Tuple[dict, set]: Datapoints by path, and the paths that were\
+            decoded into new memory for this batch and are not shared with\
+            a cache.
+        """
+        decoded = {}
+        if self._memory_cache is not None:
+            for path in paths:
+                data_point = self._memory_cache.get(path)
+                if data_point is not None:
+                    decoded[path] = data_point
+        missing = [path for path in paths if path not in decoded]
+        start = time.perf_counter()
+        for path in missing:
+            decoded[path] = self._read_data_point(path)
+            if self._memory_cache is not None:
+                self._memory_cache.put(path, decoded[path])
+        self._load_stats["files"] += len(missing)
+        self._load_stats["seconds"] += time.perf_counter() - start
+        # disk cache hits are read-only mappings of the cache files
+        if self._memory_cache is not None or self._disk_cache is not None:
+            return decoded, set()
+        return decoded, set(missing)
+
+    def __getstate__(self) -> dict:
+        """Copies and pickles leave out the threads of the async API, a\
+            copy starts its own threads when it is used asynchronously."""
+        state = self.__dict__.copy()
+        state["_async_executor"] = None
+        return state
+
+    async def aget(self, index: int) -> tuple:
+        """Async version of __getitem__. The file is read and decoded on\
+            a thread, so the event loop keeps serving other requests.
+
+        use case:
+            data_point, label = await dataset.aget(0)
+
+        Args:
+            index (int): Index of the datapoint.
+
+        Returns:
+            tuple: The same output as __getitem__.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_async_executor(), self.__getitem__, index
+        )
+
+    async def aget_batch(self, indices: List[int]) -> list:
+        """Reads several datapoints concurrently, at most max_concurrency\
+            at a time.
+
+        Args:
+            indices (List[int]): Indices of the datapoints.
+
+        Returns:
+            list: Outputs of __getitem__, in the order of indices.
+        """
+        return list(await asyncio.gather(*(self.aget(i) for i in indices)))
+
+    async def __aiter__(self) -> AsyncIterator[tuple]:
+        """Iterates over the dataset with async for. Up to max_concurrency\
+            datapoints are read ahead while the current one is consumed.
+
+        use case:
+            async for data_point, label in dataset:
+                ...
+
+        Returns:
+            AsyncIterator[tuple]: Outputs of __getitem__, in order.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_async_executor()
+        pending = deque()
+        next_index = 0
+        try:
+            while next_index < len(self) or pending:
+                while next_index < len(self) and (
+                    len(pending) < self._max_concurrency
+                ):
+                    pending.append(
+                        loop.run_in_executor(
+                            executor, self.__getitem__, next_index
+                        )
+                    )
+                    next_index += 1
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        """Stops the threads of the async API. The dataset stays usable, a\
+            later async call starts new threads.
+
+        use case:
+            with ClassificationDataset(...) as dataset:
+                data_point, label = await dataset.aget(0)
+        """
+        if self._async_executor is not None:
+            self._async_executor.shutdown(wait=True)
+            self._async_executor = None
+
+    def __enter__(self) -> "Dataset":
+        """Returns the dataset, close() is called when the block is left."""
+        return self
+
+    def __exit__(
+        self, exc_type: type, exc_value: Exception, traceback: object
+    ) -> None:
+        """Stops the threads of the async API, see close()."""
+        self.close()
+
+    def _get_async_executor(self) -> ThreadPoolExecutor:
+        """Returns the threads of the async API, creating them on first use.
+
+        Returns:
+            ThreadPoolExecutor: A pool with max_concurrency threads.
+        """
+        if self._async_executor is None:
+            self._async_executor = ThreadPoolExecutor(
+                max_workers=self._max_concurrency
+            )
+        return self._async_executor
+
+    def _read_only(
+        self, data_point: np.ndarray | tuple
+    ) -> np.ndarray | tuple:
+        """Wraps the arrays of a datapoint in read-only views, so the\
+            stored data can be handed out without copying it.
+
+        Args:
+            data_point (np.ndarray | tuple): An array, an (array, sampling\
+                rate) tuple or a label.
+
+        Returns:
+            np.ndarray | tuple: The same datapoint with read-only arrays.
+        """
+        if isinstance(data_point, np.ndarray):
+            view = data_point.view()
+            view.flags.writeable = False
+            return view
+        if isinstance(data_point, tuple):
+            return tuple(self._read_only(part) for part in data_point)
+        return data_point
+
+    @staticmethod
+    def writable(data_point: np.ndarray | tuple) -> np.ndarray | tuple:
+        """Copy-on-write helper for zero_copy datasets: returns a datapoint\
+            that can be changed in place, copying only the arrays that are\
+            read-only.
+
+        use case:
+            image = Dataset.writable(dataset[0])
+            image[0, 0] = 0
+
+        Args:
+            data_point (np.ndarray | tuple): An array or an (array, sampling\
+                rate) tuple.
+
+        Returns:
+            np.ndarray | tuple: A datapoint with writeable arrays.
+        """
+        if isinstance(data_point, np.ndarray):
+            if data_point.flags.writeable:
+                return data_point
+            return np.array(data_point)
+        if isinstance(data_point, tuple):
+            return tuple(Dataset.writable(part) for part in data_point)
+        return data_point
+
     def _if_lazy(
         self, data: Tuple[str, List] | str
     ) -> Tuple[np.array, List] | np.array:
@@ -139,13 +491,97 @@ class Dataset(AbstractDataset):
         """
         if self.lazy is True:
             if isinstance(data, list):
-                return [self._read_data_point(filename) for filename in data]
-            else:
-                return self._read_data_point(data)
+                return self._read_data_points(data)
+            return self._read_lazy_data_point(data)
+        elif self._max_memory_bytes is None:
+            return data
+        # with a memory budget, the samples that did not fit stay paths
+        elif isinstance(data, str):
+            return self._read_lazy_data_point(data)
+        elif isinstance(data, list):
+            paths = [item for item in data if isinstance(item, str)]
+            if not paths:
+                return data
+            decoded = iter(self._read_data_points(paths))
+            return [
+                next(decoded) if isinstance(item, str) else item
+                for item in data
+            ]
         else:
             return data
 
+    def _read_lazy_data_point(self, filename: str) -> np.array:
+        """Reads a single lazy datapoint through the in-memory cache, if\
+            the dataset has one.
+
+        Args:
+            filename (str): Path to the datapoint.
+
+        Returns:
+            np.array: Datapoint which is loaded to memory.
+        """
+        if self._memory_cache is None:
+            return self._read_data_point(filename)
+        data_point = self._memory_cache.get(filename)
+        if data_point is None:
+            data_point = self._read_data_point(filename)
+            self._memory_cache.put(filename, data_point)
+        return data_point
+
+    def cache_info(self) -> dict | None:
+        """Reports the hit, miss and eviction counters of the in-memory\
+            cache of a lazy dataset.
+
+        Returns:
+            dict | None: Counters of the cache, None if the dataset has no\
+            in-memory cache.
+        """
+        if self._memory_cache is None:
+            return None
+        return self._memory_cache.info()
+
     def _read_data_point(self, filename: str = "") -> np.array:
+        """A helper method which reads in a datapoint from the disk cache\
+            if it is there and decodes it otherwise.
+
+        Args:
+            filename (str, optional): Path to the datapoint. Defaults to "".
+
+        Returns:
+            np.array: Datapoint which is loaded to memory.
+        """
+        # a random crop differs on every read, so it is never cached
+        if self._disk_cache is None or "random_crop" in self._decode_hints:
+            return self._decode_data_point(filename)
+
+        params = self._decode_params()
+        cached = self._disk_cache.load(filename, params)
+        if cached is not None:
+            array, sampling_rate = cached
+            if self._data_type == "image":
+                return array
+            return (array, sampling_rate)
+
+        data_point = self._decode_data_point(filename)
+        if self._data_type == "image":
+            self._disk_cache.store(filename, params, data_point)
+        else:
+            self._disk_cache.store(filename, params, *data_point)
+        return data_point
+
+    def _decode_params(self) -> tuple:
+        """Parameters that change the result of decoding a file. They are\
+            part of the disk cache key.
+
+        Returns:
+            tuple: The decode parameters.
+        """
+        hints = tuple(sorted(self._decode_hints.items()))
+        if self._data_type == "image":
+            return ("image", "RGB", hints)
+        return ("audio", self._sample_rate, hints)
+
+    def _decode_data_point(self, filename: str = "") -> np.array:
         """A helper method which determines if the data to be read in\
             is audio data or image data.
 
@@ -164,6 +600,161 @@ class Dataset(AbstractDataset):
             print("data type {data_type} is not supported.")
             raise NotImplementedError
 
+    def _read_data_points(self, filepaths: List[str]) -> list:
+        """Decodes a list of files, on a worker pool if num_workers is\
+            bigger than 1. The output keeps the order of filepaths, so\
+            labels created from the same listing stay aligned.
+
+        Args:
+            filepaths (List[str]): Paths to the datapoints.
+
+        Returns:
+            list: Datapoints loaded to memory, in the order of filepaths.
+        """
+        return list(self._iter_data_points(filepaths))
+
+    def _iter_data_points(self, filepaths: List[str]) -> Iterator:
+        """Decodes a list of files like _read_data_points, but yields the\
+            datapoints one by one so that they can be copied into a\
+            preallocated buffer.
+
+        Args:
+            filepaths (List[str]): Paths to the datapoints.
+
+        Returns:
+            Iterator: Datapoints loaded to memory, in the order of filepaths.
+        """
+        start = time.perf_counter()
+        if self._num_workers == 1 or len(filepaths) <= 1:
+            yield from map(self._read_data_point, filepaths)
+        elif self._executor == "thread":
+            with ThreadPoolExecutor(max_workers=self._num_workers) as pool:
+                yield from pool.map(self._read_data_point, filepaths)
+        else:
+            # bigger chunks keep pickling overhead low for process pools
+            chunksize = max(1, len(filepaths) // (self._num_workers * 4))
+            with ProcessPoolExecutor(
+                max_workers=self._num_workers,
+                initializer=_init_decoder,
+                initargs=(self._decoder(),),
+            ) as pool:
+                yield from pool.map(
+                    _decode_in_worker, filepaths, chunksize=chunksize
+                )
+            # process workers stored entries this process did not count
+            if self._disk_cache is not None:
+                self._disk_cache.refresh()
+        self._load_stats["files"] += len(filepaths)
+        self._load_stats["seconds"] += time.perf_counter() - start
+
+    def _decoder(self) -> "Dataset":
+        """Returns a shallow copy of the dataset without its data, labels,\
+            paths and metadata. It decodes files like the dataset and is\
+            small enough to send to every process worker once.
+
+        Returns:
+            Dataset: The decoder.
+        """
+        decoder = copy(self)
+        decoder.data = None
+        decoder.labels = None
+        decoder._filepaths = None
+        decoder._metadata = None
+        decoder._memory_cache = None
+        return decoder
+
+    def _read_contiguous_images(
+        self, filepaths: List[str]
+    ) -> "np.ndarray | RaggedArray":
+        """Decodes images straight into one preallocated block of memory.\
+            The image sizes are taken from the file headers first. If all\
+            images share a shape the block is an (N, H, W, C) array,\
+            otherwise it is a RaggedArray with one flat buffer.
+
+        Args:
+            filepaths (List[str]): Paths to the images.
+
+        Returns:
+            np.ndarray | RaggedArray: The decoded images.
+        """
+        headers = self.metadata()
+        shapes = np.stack(
+            (
+                headers["height"],
+                headers["width"],
+                np.full(len(filepaths), 3),
+            ),
+            axis=1,
+        )
+        if len(shapes) > 0 and np.all(shapes == shapes[0]):
+            data = np.empty((len(filepaths), *shapes[0]), dtype=np.uint8)
+        else:
+            data = RaggedArray.from_shapes(shapes, np.uint8)
+        for index, image in enumerate(self._iter_data_points(filepaths)):
+            data[index][...] = image
+        return data
+
+    def load_report(self) -> dict:
+        """Reports how fast the files were decoded during eager loading.
+
+        Returns:
+            dict: Number of decoded files, seconds spent decoding, files\
+            per second, number of workers and the executor kind.
+        """
+        files = self._load_stats["files"]
+        seconds = self._load_stats["seconds"]
+        return {
+            "files": files,
+            "seconds": seconds,
+            "files_per_second": files / seconds if seconds > 0 else 0.0,
+            "num_workers": self._num_workers,
+            "executor": self._executor,
+        }
+
+    def metadata(
+        self,
+        cache_path: str = None,
+        num_workers: int = None,
+        refresh: bool = False,
+    ) -> dict:
+        """Builds an index of the source files from their headers only:\
+            image sizes, or sampling rates, frame counts and durations of\
+            audio. No file is decoded, which makes the index cheap enough\
+            to plan batching, bucketing and memory use before loading.
+
+        use case:
+            durations = dataset.metadata()["duration"]
+
+        Args:
+            cache_path (str, optional): .npz file to keep the index in. It\
+                is reused while no file was added, removed or changed.\
+                Defaults to None (no cache file).
+            num_workers (int, optional): Number of threads reading headers.\
+                Defaults to None (num_workers of the dataset, at least 8).
+            refresh (bool, optional): Read the headers again even if an\
+                index exists. Defaults to False.
+
+        Returns:
+            dict: One numpy array per column, in the order of the datapoints.
+        """
+        filepaths = self.data if self.lazy is True else self._filepaths
+        filepaths = list(filepaths)
+        if not refresh and self._metadata is not None:
+            if self._metadata["path"].tolist() == filepaths:
+                return self._metadata
+
+        metadata = None
+        if cache_path is not None and not refresh:
+            metadata = load_metadata(cache_path, filepaths)
+        if metadata is None:
+            if num_workers is None:
+                num_workers = max(self._num_workers, 8)
+            metadata = read_metadata(filepaths, self._data_type, num_workers)
+            if cache_path is not None:
+                save_metadata(metadata, cache_path)
+        self._metadata = metadata
+        return metadata
+
     def _read_image(self, filename: str = "") -> np.array:
         """Reads image from an specified file and returns it as an array\
             of pixel values.
@@ -175,14 +766,57 @@ class Dataset(AbstractDataset):
             np.array: Picture data as an array
         """
 
-        # Open the image file
-        image = Image.open(filename).convert("RGB")
+        # Open the image file, this only reads the header
+        image = Image.open(filename)
+        # Crop before the conversion, so only the crop is converted to RGB
+        # and copied into the numpy array
+        if "center_crop" in self._decode_hints:
+            height, width = self._decode_hints["center_crop"]
+            box = self._center_crop_box(
+                image.height, image.width, height, width
+            )
+            if box != (0, 0, image.width, image.height):
+                image = image.crop(box)
+        image = image.convert("RGB")
         # Convert the image data to a numpy array
         image_data = np.array(image)
         return image_data
 
+    @staticmethod
+    def _center_crop_box(
+        original_height: int, original_width: int, height: int, width: int
+    ) -> Tuple[int, int, int, int]:
+        """Computes the box of a center crop. A dimension is only cropped\
+            if the crop is smaller than the image in that dimension. Both\
+            CenterCrop and the decode hints use this box, so a crop gives\
+            the same result whether it is done while decoding or after.
+
+        Args:
+            original_height (int): Height of the image.
+            original_width (int): Width of the image.
+            height (int): Desired height of the crop.
+            width (int): Desired width of the crop.
+
+        Returns:
+            Tuple[int, int, int, int]: (left, top, right, bottom) of the box.
+        """
+        center_x = original_width // 2
+        center_y = original_height // 2
+        left, right = 0, original_width
+        top, bottom = 0, original_height
+        if height < original_height:
+            top = max(center_y - height // 2, 0)
+            bottom = min(center_y + height // 2, original_height)
+        if width < original_width:
+            left = max(center_x - width // 2, 0)
+            right = min(center_x + width // 2, original_width)
+        return (left, top, right, bottom)
+
     def _read_sound(self, filename: str = "") -> np.array:
-        """Reads audio from an specified file and returns it as an array.
+        """Reads audio from an specified file and returns it as an array.\
+            The audio is resampled once while loading, to the rate of a\
+            fused Resampler if there is one and to sample_rate otherwise.\
+            With a fused RandomCropper only the cropped frames are decoded.
 
         Args:
             filename (str, optional): Path to the file. Defaults to "".
@@ -191,7 +825,32 @@ class Dataset(AbstractDataset):
             np.array: Audio data as an array.
 
         """
-        sound_time_series, sampling_rate = librosa.load(filename)
+        sample_rate = self._decode_hints.get("sample_rate", self._sample_rate)
+        sample_rate = None if sample_rate == "native" else sample_rate
+
+        if "random_crop" in self._decode_hints:
+            crop_duration = self._decode_hints["random_crop"]
+            # the duration comes from the file header, nothing is decoded
+            audio_duration = librosa.get_duration(path=filename)
+            if crop_duration < audio_duration:
+                start_time = np.random.uniform(
+                    0, audio_duration - crop_duration
+                )
+                # only the frames of the crop are decoded
+                sound_time_series, sampling_rate = librosa.load(
+                    filename,
+                    sr=sample_rate,
+                    offset=start_time,
+                    duration=crop_duration,
+                )
+                sound_time_series = sound_time_series[
+                    : int(crop_duration * sampling_rate)
+                ]
+                return (sound_time_series, sampling_rate)
+
+        sound_time_series, sampling_rate = librosa.load(
+            filename, sr=sample_rate
+        )
         sound_data = (sound_time_series, sampling_rate)
         return sound_data
 
@@ -211,60 +870,218 @@ class Dataset(AbstractDataset):
             np.array: a list of all of the datapoints
 
         """
-        file_list = os.listdir(folder)
-        filepaths = [
-            os.path.join(folder, name)
-            for name in file_list
-            if name != ".DS_Store"
-        ]
-        if self.lazy is False:
-            data = []
-            for file in filepaths:
-                if any(
-                    ext.lower() in file.lower()
-                    for ext in [
-                        ".jpg",
-                        ".jpeg",
-                        ".png",
-                        ".gif",
-                        ".webp",
-                        ".wav",
-                        ".mp3",
-                    ]
-                ):
-                    data.append(self._read_data_point(file))
+        filepaths = [entry.path for entry in iter_supported_files(folder)]
+        return self._create_data_from_paths(filepaths)
 
-            return data
+    def _create_data_from_csv(self) -> Tuple[list, np.ndarray]:
+        """Reads the file names and labels of a csv file in a single pass\
+            and loads the respective pictures or audio data.
+
+        Returns:
+            Tuple[list, np.ndarray]: Image/audio data (or the paths if lazy\
+            is True) and the labels as a numpy array.
+        """
+        filepaths = []
+        label_chunks = []
+        for names, labels in self._iter_csv_chunks():
+            filepaths.extend(
+                os.path.join(self._root, name) for name in names.tolist()
+            )
+            label_chunks.append(labels)
+        if label_chunks:
+            labels = np.concatenate(label_chunks)
         else:
-            return filepaths
+            labels = np.array([], dtype=self._csv_label_dtype)
+        return self._create_data_from_paths(filepaths, labels), labels
 
-    def _create_data_from_csv(self) -> np.array:
+    def _iter_csv_chunks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Parses the csv file chunk by chunk. Only the first (file name)\
+            and the last (label) column are parsed, with explicit dtypes,\
+            so no column has to be inferred or kept in memory.
+
+        Returns:
+            Iterator[Tuple[np.ndarray, np.ndarray]]: File names and labels\
+            of every chunk of csv_chunksize rows.
         """
-        Reads datapoints from a csv file and loads their respective pictures\
-            audio data
-        as np.arrays.
+        columns = pd.read_csv(self._csv_path, nrows=0).columns
+        name_column, label_column = columns[0], columns[-1]
+        dtypes = {name_column: str}
+        if self._csv_label_dtype is not None:
+            dtypes[label_column] = self._csv_label_dtype
+        chunks = pd.read_csv(
+            self._csv_path,
+            usecols=[name_column, label_column],
+            dtype=dtypes,
+            chunksize=self._csv_chunksize,
+        )
+        for chunk in chunks:
+            yield (
+                chunk[name_column].to_numpy(dtype=str),
+                chunk[label_column].to_numpy(dtype=self._csv_label_dtype),
+            )
+
+    def _create_data_from_paths(
+        self, filepaths: List[str], labels: list | np.ndarray = None
+    ) -> list:
+        """Remembers the source files of the dataset and decodes them,\
+            unless the dataset is lazy.
+
+        Args:
+            filepaths (List[str]): Paths to the datapoints.
+            labels (list | np.ndarray, optional): Labels the dataset will\
+                hold, they count against max_memory_bytes. Defaults to None.
 
         Returns:
-            np.ndarray: Image/audio data as an np.ndarray
+            list: The decoded datapoints, or the paths if lazy is True.
         """
-        df = pd.read_csv(self._csv_path)
-        filenames = df.iloc[:, 0].tolist()
-        filepaths = [os.path.join(self._root, str(name)) for name in filenames]
-        if self.lazy is False:
-            data = [self._read_data_point(filename) for filename in filepaths]
-            return data
+        self._filepaths = filepaths
+        if self.lazy is False and self._contiguous is True:
+            return self._read_contiguous_images(filepaths)
+        elif self.lazy is False and self._max_memory_bytes is not None:
+            return self._read_within_budget(filepaths, labels)
+        elif self.lazy is False:
+            return self._read_data_points(filepaths)
         else:
             return filepaths
 
-    def _create_labels_from_csv(self) -> np.array:
-        """Reads labels from a csv file stored in self._csv_path
+    def _read_within_budget(
+        self, filepaths: List[str], labels: list | np.ndarray = None
+    ) -> list:
+        """Decodes the files that fit in max_memory_bytes and keeps the\
+            others as paths, which are decoded on access like in a lazy\
+            dataset. The decoded size of every file is estimated from its\
+            header, so nothing is decoded before the choice is made. The\
+            labels, the paths and the metadata index are taken off the\
+            budget first, so the total of memory_usage stays within it.
+
+        Args:
+            filepaths (List[str]): Paths to the datapoints.
+            labels (list | np.ndarray, optional): Labels of the dataset.\
+                Defaults to None.
+
+        Returns:
+            list: Decoded datapoints and paths, in the order of filepaths.
+        """
+        estimates = self._estimate_decoded_bytes()
+        # counted like memory_usage, with every sample still a path
+        reserved = (
+            sys.getsizeof(list(filepaths))
+            + sum(sys.getsizeof(path) for path in filepaths)
+            + self._labels_bytes(labels)
+            + sum(column.nbytes for column in self._metadata.values())
+        )
+        if self._memory_cache is not None:
+            reserved += self._memory_cache._max_bytes
+        remaining = self._max_memory_bytes - reserved
+        eager_indices = []
+        for index, estimate in enumerate(estimates.tolist()):
+            if estimate <= remaining:
+                eager_indices.append(index)
+                remaining -= estimate
+
+        data = list(filepaths)
+        decoded = self._read_data_points([data[i] for i in eager_indices])
+        for index, data_point in zip(eager_indices, decoded):
+            data[index] = data_point
+        return data
+
+    def _estimate_decoded_bytes(self) -> np.ndarray:
+        """Estimates the decoded size of every source file from its header.
+
+        Returns:
+            np.ndarray: Bytes per datapoint, in the order of the files.
+        """
+        headers = self.metadata()
+        if self._data_type == "image":
+            # images are decoded to RGB uint8
+            return headers["height"].astype(np.int64) * headers["width"] * 3
+        if self._sample_rate == "native":
+            sampling_rates = headers["sampling_rate"]
+        else:
+            sampling_rates = self._sample_rate
+        # librosa decodes to mono float32
+        samples = np.ceil(headers["duration"] * sampling_rates)
+        return samples.astype(np.int64) * np.dtype(np.float32).itemsize
+
+    def memory_usage(self) -> dict:
+        """Reports the memory the dataset holds and how its samples are\
+            stored: "eager" samples are decoded in memory, "cached" samples\
+            are read from the disk cache when accessed and "lazy" samples\
+            are decoded when accessed.
+
+        Returns:
+            dict: Bytes of data, labels and overhead (containers, paths,\
+            the in-memory cache and the metadata index), their total, the\
+            budget and the number of samples per storage kind.
+        """
+        data_bytes = 0
+        overhead = 0
+        spilled = 0
+        if isinstance(self.data, (np.ndarray, RaggedArray)):
+            data_bytes = self.data.nbytes
+        elif self.data is not None:
+            overhead += sys.getsizeof(self.data)
+            for item in self.data:
+                if isinstance(item, str):
+                    spilled += 1
+                    overhead += sys.getsizeof(item)
+                else:
+                    data_bytes += self._data_point_bytes(item)
+
+        label_bytes = self._labels_bytes(self.labels)
+
+        if self._memory_cache is not None:
+            overhead += self._memory_cache.info()["current_bytes"]
+        if self._metadata is not None:
+            overhead += sum(
+                column.nbytes for column in self._metadata.values()
+            )
+
+        return {
+            "data": data_bytes,
+            "labels": label_bytes,
+            "overhead": overhead,
+            "total": data_bytes + label_bytes + overhead,
+            "budget": self._max_memory_bytes,
+            "eager": len(self) - spilled,
+            "cached": spilled if self._disk_cache is not None else 0,
+            "lazy": spilled if self._disk_cache is None else 0,
+        }
+
+    @staticmethod
+    def _labels_bytes(labels: list | np.ndarray | None) -> int:
+        """Bytes held by the labels of a dataset.
+
+        Args:
+            labels (list | np.ndarray | None): The labels.
+
+        Returns:
+            int: Bytes of the array, or of the list and its items.
+        """
+        if isinstance(labels, np.ndarray):
+            return labels.nbytes
+        if labels is None:
+            return 0
+        return sys.getsizeof(labels) + sum(
+            sys.getsizeof(label) for label in labels
+        )
+
+    @staticmethod
+    def _data_point_bytes(data_point: np.ndarray | tuple) -> int:
+        """Bytes of the arrays of a decoded datapoint.
+
+        Args:
+            data_point (np.ndarray | tuple): An array or an (array,\
+                sampling rate) tuple.
 
         Returns:
-            np.array: Labels in an array.
+            int: Bytes of the arrays.
         """
-        df = pd.read_csv(self._csv_path)
-        labels = df.iloc[:, -1].tolist()
-        return labels
+        if isinstance(data_point, np.ndarray):
+            return data_point.nbytes
+        if isinstance(data_point, tuple):
+            return sum(Dataset._data_point_bytes(part) for part in data_point)
+        return 0
 
     def train_test_split(
         self,
@@ -272,7 +1089,8 @@ class Dataset(AbstractDataset):
         shuffle: bool = False,
     ) -> Tuple[np.array, np.array] | np.array:
         """Split the dataset into training and test sets. Data can be\
-            shuffled in the process.
+            shuffled in the process. The sets are decoded and returned as\
+            data, use split to get Subset views instead.
 
         Args:
             train_split (float, optional): Percentage of data for training.\
@@ -287,11 +1105,7 @@ class Dataset(AbstractDataset):
         Returns:
             Tuple[np.array, np.array] | np.array: Training and test sets.
         """
-        if len(self.data) <= 1:
-            raise TypeError("Number of datapoints has to be bigger than 1")
-
-        if train_split < 0 or train_split > 1:
-            raise TypeError("Train_split attribute has to be between 0 and 1.")
+        self._check_split(train_split)
 
         if shuffle is True and self._labels_bool is True:
             data, labels = self._shuffle_data(self.data, self.labels)
@@ -308,7 +1122,7 @@ class Dataset(AbstractDataset):
 
         if self._labels_bool is True:
             train_labels = labels[:split]
-            test_labels = data[split:]
+            test_labels = labels[split:]
 
             return (
                 self._if_lazy(train_data),
@@ -319,6 +1133,161 @@ class Dataset(AbstractDataset):
         else:
             return self._if_lazy(train_data), self._if_lazy(test_data)
 
+    def split(
+        self,
+        train_split: float = 0.8,
+        shuffle: bool = False,
+        seed: int = None,
+    ) -> Tuple["Subset", "Subset"]:
+        """Splits the dataset into a training and a test Subset. Only the\
+            indices are split, nothing is copied or decoded, so lazy\
+            datasets stay lazy.
+
+        use case:
+            train, test = dataset.split(0.8, shuffle=True, seed=0)
+
+        Args:
+            train_split (float, optional): Part of the data for training.\
+                Defaults to 0.8.
+            shuffle (bool, optional): Whether to shuffle the indices first.\
+                Defaults to False.
+            seed (int, optional): Seed of the shuffle. Defaults to None.
+
+        Raises:
+            TypeError: If you have 1 datapoint it is impossible to split it.
+            TypeError: train_split has to be between 0 and 1.
+
+        Returns:
+            Tuple[Subset, Subset]: Training and test subsets.
+        """
+        self._check_split(train_split)
+        indices = np.arange(len(self))
+        if shuffle is True:
+            indices = np.random.default_rng(seed).permutation(indices)
+        split = int(len(indices) * train_split)
+        return Subset(self, indices[:split]), Subset(self, indices[split:])
+
+    def stratified_split(
+        self, train_split: float = 0.8, seed: int = None
+    ) -> Tuple["Subset", "Subset"]:
+        """Splits the dataset into a training and a test Subset that both\
+            keep the label proportions of the dataset. Every class is\
+            shuffled and split on its own.
+
+        Args:
+            train_split (float, optional): Part of every class for training.\
+                Defaults to 0.8.
+            seed (int, optional): Seed of the shuffle. Defaults to None.
+
+        Raises:
+            TypeError: If the dataset has no labels.
+
+        Returns:
+            Tuple[Subset, Subset]: Training and test subsets.
+        """
+        self._check_split(train_split)
+        rng = np.random.default_rng(seed)
+        train_indices, test_indices = [], []
+        for class_indices in self._class_indices():
+            class_indices = rng.permutation(class_indices)
+            split = int(round(len(class_indices) * train_split))
+            train_indices.append(class_indices[:split])
+            test_indices.append(class_indices[split:])
+        return (
+            Subset(self, np.sort(np.concatenate(train_indices))),
+            Subset(self, np.sort(np.concatenate(test_indices))),
+        )
+
+    def k_fold(
+        self,
+        k: int = 5,
+        shuffle: bool = False,
+        seed: int = None,
+        stratified: bool = False,
+    ) -> List[Tuple["Subset", "Subset"]]:
+        """Splits the dataset into k folds for cross-validation. Every fold\
+            is the test subset once, the other folds form its training\
+            subset.
+
+        use case:
+            for train, test in dataset.k_fold(5, shuffle=True, seed=0):
+                ...
+
+        Args:
+            k (int, optional): Number of folds. Defaults to 5.
+            shuffle (bool, optional): Whether to shuffle the indices first.\
+                Defaults to False.
+            seed (int, optional): Seed of the shuffle. Defaults to None.
+            stratified (bool, optional): Deal every class over the folds so\
+                that they keep the label proportions. Defaults to False.
+
+        Raises:
+            TypeError: k has to be between 2 and the number of datapoints.
+
+        Returns:
+            List[Tuple[Subset, Subset]]: (train, test) subsets of every fold.
+        """
+        if k < 2 or k > len(self):
+            raise TypeError(
+                "k has to be between 2 and the number of datapoints."
+            )
+        rng = np.random.default_rng(seed)
+        if stratified is True:
+            folds = [[] for _ in range(k)]
+            position = 0
+            for class_indices in self._class_indices():
+                if shuffle is True:
+                    class_indices = rng.permutation(class_indices)
+                # continue where the last class stopped to balance fold sizes
+                for index in class_indices:
+                    folds[position % k].append(index)
+                    position += 1
+            folds = [np.sort(np.array(fold, dtype=np.int64)) for fold in folds]
+        else:
+            indices = np.arange(len(self))
+            if shuffle is True:
+                indices = rng.permutation(indices)
+            folds = np.array_split(indices, k)
+
+        splits = []
+        for fold in range(k):
+            train = np.concatenate(folds[:fold] + folds[fold + 1 :])
+            splits.append(
+                (Subset(self, np.sort(train)), Subset(self, folds[fold]))
+            )
+        return splits
+
+    def _check_split(self, train_split: float) -> None:
+        """Checks the arguments of a split.
+
+        Args:
+            train_split (float): Part of the data for training.
+
+        Raises:
+            TypeError: If you have 1 datapoint it is impossible to split it.
+            TypeError: train_split has to be between 0 and 1.
+        """
+        if len(self) <= 1:
+            raise TypeError("Number of datapoints has to be bigger than 1")
+        if train_split < 0 or train_split > 1:
+            raise TypeError("Train_split attribute has to be between 0 and 1.")
+
+    def _class_indices(self) -> List[np.ndarray]:
+        """Groups the indices of the datapoints by label.
+
+        Raises:
+            TypeError: If the dataset has no labels.
+
+        Returns:
+            List[np.ndarray]: Indices of every class, in class order.
+        """
+        if self.labels is None:
+            raise TypeError("A stratified split needs a dataset with labels.")
+        _, codes = np.unique(np.asarray(self.labels), return_inverse=True)
+        order = np.argsort(codes, kind="stable")
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        return np.split(order, boundaries)
+
     def _shuffle_data(self, data: list, labels: list) -> list:
         """Helper function to help with shuffleing the data as\
         a part of train test split functionality. It takes the\
@@ -336,16 +1305,34 @@ class Dataset(AbstractDataset):
 
         """
         shuffled_indices = random.sample(range(len(data)), len(data))
-        shuffled_data = [data[i] for i in shuffled_indices]
+        shuffled_data = self._take(data, shuffled_indices)
 
         if labels is not None:
             if len(data) != len(labels):
                 raise TypeError("data and labels have to be the same size")
-            shuffled_labels = [labels[i] for i in shuffled_indices]
+            shuffled_labels = self._take(labels, shuffled_indices)
             return shuffled_data, shuffled_labels
         else:
             return shuffled_data
 
+    @staticmethod
+    def _take(
+        data: "list | np.ndarray | RaggedArray", indices: List[int]
+    ) -> "list | np.ndarray | RaggedArray":
+        """Selects items by index, with a single fancy index for arrays.
+
+        Args:
+            data (list | np.ndarray | RaggedArray): Data or labels.
+            indices (List[int]): Indices to select.
+
+        Returns:
+            list | np.ndarray | RaggedArray: The selected items, of the\
+            same kind as data.
+        """
+        if isinstance(data, (np.ndarray, RaggedArray)):
+            return data[np.asarray(indices, dtype=np.int64)]
+        return [data[i] for i in indices]
+
     @property
     def root(self) -> str:
         """Getter for the root path of the dataset.
@@ -372,3 +1359,101 @@ class Dataset(AbstractDataset):
             str: Returns the data type as a string.
         """
         return self._data_type
+
+
+class Subset:
+    """A view on part of a dataset: an index array over the parent dataset.\
+        Datapoints are read from the parent when they are accessed, so\
+        creating a subset costs nothing but the index array, and a lazy\
+        parent stays lazy.
+
+    use case:
+        train, test = dataset.split(0.8, shuffle=True)
+        data_point, label = train[0]
+
+    Attributes:
+        dataset (Dataset): The parent dataset.
+        indices (np.ndarray): Indices of the subset in the parent dataset.
+    """
+
+    def __init__(self, dataset: Dataset, indices: List[int]) -> None:
+        """Initialize the subset. A subset of a subset indexes the\
+            original dataset directly.
+
+        Args:
+            dataset (Dataset): The parent dataset.
+            indices (List[int]): Indices of the subset in the parent.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if isinstance(dataset, Subset):
+            indices = dataset.indices[indices]
+            dataset = dataset.dataset
+        self.dataset = dataset
+        self.indices = indices
+
+    def __repr__(self) -> str:
+        """__repr__() defines the string representation of the given object.
+
+        use case:
+            train, test = dataset.split()
+            print(train)
+        """
+        return (
+            f"{self.__class__.__name__}:(\n"
+            f"Parent: {self.dataset.__class__.__name__},\n"
+            f"Number of datapoints: {len(self)}\n"
+            ")"
+        )
+
+    def __len__(self) -> int:
+        """Return the number of datapoints in the subset."""
+        return len(self.indices)
+
+    def __getitem__(self, index: int) -> tuple:
+        """Get a datapoint of the parent dataset.
+
+        Args:
+            index (int): Index in the subset.
+
+        Returns:
+            tuple: The output of the parent's __getitem__.
+        """
+        return self.dataset[int(self.indices[index])]
+
+    def get_batch(self, indices: Sequence[int]) -> list:
+        """Batched version of __getitem__, see Dataset.get_batch.
+
+        Args:
+            indices (Sequence[int]): Indices in the subset.
+
+        Returns:
+            list: Outputs of the parent's __getitem__.
+        """
+        return self.dataset.get_batch(self.indices[np.asarray(indices)])
+
+    def __iter__(self) -> Iterator[tuple]:
+        """Iterate over the datapoints of the subset in order."""
+        for index in self.indices:
+            yield self.dataset[int(index)]
+
+    @property
+    def labels(self) -> list | np.ndarray | None:
+        """Labels of the subset, selected from the parent's labels.
+
+        Returns:
+            list | np.ndarray | None: The labels, None if the parent has none.
+        """
+        if self.dataset.labels is None:
+            return None
+        return Dataset._take(self.dataset.labels, self.indices)
+
+    async def aget(self, index: int) -> tuple:
+        """Async version of __getitem__, see Dataset.aget.
+
+        Args:
+            index (int): Index in the subset.
+
+        Returns:
+            tuple: The output of the parent's __getitem__.
+        """
+        return await self.dataset.aget(int(self.indices[index]))
@@ -2,6 +2,9 @@ import os
 import sys
 from abc import ABC, abstractmethod
 from copy import deepcopy
+from typing import List, Sequence, Tuple
+
+import numpy as np
 
 from abc_dataset import Dataset
 from classification_dataset import ClassificationDataset
@@ -26,16 +29,127 @@ class PreProcessingTechnique(ABC):
         Returns:
             Dataset: preprocessed dataset
         """
+        dataset_for_processing, remaining_steps = self._load_for_processing(
+            dataset, [self]
+        )
+        if remaining_steps:
+            new_data = self._transformation(dataset_for_processing)
+        else:
+            # the step was already applied while decoding
+            new_data = dataset_for_processing.data
+        new_dataset = deepcopy(dataset)
+        new_dataset.data, new_dataset.labels = new_data, dataset.labels
+        new_dataset.lazy = False
+        return new_dataset
+
+    def _load_for_processing(
+        self, dataset: Dataset, steps: Sequence["PreProcessingTechnique"]
+    ) -> Tuple[Dataset, List["PreProcessingTechnique"]]:
+        """Returns an eager copy of the dataset to preprocess. If the\
+            dataset is lazy, the leading steps that can be done while\
+            decoding (see _decode_hint) are pushed into the decoding, so\
+            for example a center crop never converts the full image.
+
+        Args:
+            dataset (Dataset): dataset for the preprocessing
+            steps (Sequence[PreProcessingTechnique]): steps that are about\
+                to be applied, in order
+
+        Returns:
+            Tuple[Dataset, List[PreProcessingTechnique]]: the eager copy\
+            and the steps that still have to be applied to it
+        """
         dataset_for_processing = deepcopy(dataset)
+        remaining_steps = list(steps)
         if dataset_for_processing.lazy is True:
+            hints = {}
+            while remaining_steps:
+                hint = remaining_steps[0]._decode_hint()
+                if (
+                    hint is None
+                    or remaining_steps[0]._processing_type != dataset.data_type
+                    or hints.keys() & hint.keys()
+                ):
+                    break
+                hints.update(hint)
+                remaining_steps.pop(0)
+
+            dataset_for_processing._decode_hints = hints
             dataset_for_processing.data = dataset_for_processing._if_lazy(
                 dataset_for_processing.data
             )
+            dataset_for_processing._decode_hints = {}
             dataset_for_processing.lazy = False
-        new_data = self._transformation(dataset_for_processing)
-        new_dataset = deepcopy(dataset)
-        new_dataset.data, new_dataset.labels = new_data, dataset.labels
-        return new_dataset
+        else:
+            # samples that did not fit a memory budget are still paths
+            dataset_for_processing.data = dataset_for_processing._if_lazy(
+                dataset_for_processing.data
+            )
+        return dataset_for_processing, remaining_steps
+
+    def apply_batch(
+        self, batch: np.ndarray | Sequence[np.ndarray]
+    ) -> np.ndarray | list:
+        """Applies the step to a batch of datapoints, e.g. the stacked\
+            output of a Collator or the data of a contiguous dataset. A\
+            stacked np.ndarray is processed in one vectorised call, ragged\
+            data (a list or a RaggedArray) one datapoint at a time.
+
+        use case:
+            images = CenterCrop(64, 64).apply_batch(images)
+
+        Args:
+            batch (np.ndarray | Sequence[np.ndarray]): Datapoints stacked\
+                along the first axis, or a sequence of datapoints.
+
+        Returns:
+            np.ndarray | list: The processed datapoints, stacked if the\
+            batch was stacked.
+        """
+        if isinstance(batch, np.ndarray):
+            return self._transform_batch(batch)
+        return [self._transform_item(data_point) for data_point in batch]
+
+    def _transform_batch(self, batch: np.ndarray) -> np.ndarray:
+        """Processes stacked datapoints. Steps that can be vectorised\
+            override it; by default every datapoint is processed on its own\
+            and the results are stacked again.
+
+        Args:
+            batch (np.ndarray): Datapoints stacked along the first axis.
+
+        Returns:
+            np.ndarray: The processed datapoints.
+        """
+        return np.stack(
+            [self._transform_item(data_point) for data_point in batch]
+        )
+
+    @abstractmethod
+    def _transform_item(self, data_point: np.ndarray) -> np.ndarray:
+        """Processes a single datapoint, the fallback for ragged data.
+
+        Args:
+            data_point (np.ndarray): A datapoint.
+
+        Raises:
+            NotImplementedError: given method is not implemented\
+                in the ABC but in the individual preprocessing techniques
+
+        Returns:
+            np.ndarray: The processed datapoint.
+        """
+        raise NotImplementedError
+
+    def _decode_hint(self) -> dict | None:
+        """Describes the step as a decode hint, if the step can be done\
+            while a lazy dataset decodes its files. Steps that can't be\
+            done while decoding return None.
+
+        Returns:
+            dict | None: the decode hint of the step
+        """
+        return None
 
     @abstractmethod
     def _transformation(
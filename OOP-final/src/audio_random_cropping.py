@@ -90,3 +90,26 @@ class RandomCropper(PreProcessingTechnique):
         cropped_audio_nparray = audio_nparray[start_sample:end_sample]
 
         return (cropped_audio_nparray, sampling_rate)
+
+    def _transform_item(self, audio_sample: tuple) -> tuple:
+        """Crops a single audio sample, see _random_crop. apply_batch\
+            takes a list of (time series, sampling rate) tuples.
+
+        Args:
+            audio_sample (tuple): a tuple of the nparray representation\
+                of the audio file and the sampling rate
+
+        Returns:
+            tuple: the processed (time series, sampling rate) tuple
+        """
+        return self._random_crop(audio_sample)
+
+    def _decode_hint(self) -> dict:
+        """A random crop can be done while loading the audio: the duration\
+            is read from the file header and only the frames of the crop\
+            are decoded.
+
+        Returns:
+            dict: The decode hint of the crop.
+        """
+        return {"random_crop": self.crop_duration}
@@ -66,3 +66,25 @@ class Resampler(PreProcessingTechnique):
         )
 
         return (resampled_np_array, self._resampling_rate)
+
+    def _transform_item(self, audio_sample: tuple) -> tuple:
+        """Resamples a single audio sample, see _resampling. apply_batch\
+            takes a list of (time series, sampling rate) tuples.
+
+        Args:
+            audio_sample (tuple): a tuple of the nparray representation\
+                of the audio file and the sampling rate
+
+        Returns:
+            tuple: the processed (time series, sampling rate) tuple
+        """
+        return self._resampling(audio_sample)
+
+    def _decode_hint(self) -> dict:
+        """Resampling can be done while loading the audio, so a lazy\
+            dataset decodes and resamples every file exactly once.
+
+        Returns:
+            dict: The decode hint of the resampling.
+        """
+        return {"sample_rate": self._resampling_rate}
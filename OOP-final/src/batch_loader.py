@@ -1,20 +1,99 @@
-from typing import List
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from copy import deepcopy
+from typing import Callable, Iterable, List
 
 import numpy as np
 
+# data of a process worker, set once per worker by _init_worker so that it
+# is not pickled again for every batch
+_worker_data = None
+
+
+def _gather(data: np.ndarray, indices: np.ndarray) -> List[np.ndarray]:
+    """
+    Collect the items of a batch. A Dataset reads the whole batch with
+    get_batch, so a lazy dataset only decodes the files of the batch.
+
+    Args:
+        data (np.ndarray): The input data, or a Dataset.
+        indices (np.ndarray): Indices of the batch.
+
+    Returns:
+        List[np.ndarray]: The batch, an np.ndarray if data is an np.ndarray.
+    """
+    if hasattr(data, "get_batch"):
+        return data.get_batch(indices)
+    if isinstance(data, np.ndarray):
+        # arrays, e.g. encoded labels, are batched with one fancy index
+        return data[indices]
+    return [data[i] for i in indices]
+
+
+def _init_worker(data: np.ndarray) -> None:
+    """
+    Store the data in a process worker.
+
+    Args:
+        data (np.ndarray): The input data.
+    """
+    global _worker_data
+    _worker_data = data
+
+
+def _gather_in_worker(indices: np.ndarray) -> List[np.ndarray]:
+    """
+    Collect the items of a batch in a process worker.
+
+    Args:
+        indices (np.ndarray): Indices of the batch.
+
+    Returns:
+        List[np.ndarray]: The batch.
+    """
+    return _gather(_worker_data, indices)
+
 
 class BatchLoader:
     """
     A class for loading batches of data from a given dataset.
 
     Attributes:
-        data (np.ndarray): The input data to be batch-loaded.
+        data (np.ndarray): The input data to be batch-loaded, a sequence or
+            a Dataset. A Dataset is read with get_batch.
         batch_size (int): Size of each batch. Defaults to 10.
         shuffle (bool): Whether to shuffle the data before creating batches.
             Defaults to False.
         include_smaller (bool): Whether to include a smaller batch for the
             remaining data when len(data) is not divisible by batch_size.
             Defaults to True.
+        num_workers (int): Number of workers that build batches in the
+            background. 0 builds every batch when it is asked for.
+            Defaults to 0.
+        prefetch_factor (int): Number of batches every worker builds ahead.
+            Defaults to 2.
+        executor (str): Kind of worker pool, "thread" or "process".
+            Defaults to "thread".
+        collator (Collator): Turns every batch into stacked arrays, see
+            collator.py. Defaults to None (batches are lists).
+        batch_sampler (Iterable): Yields the indices of every batch, e.g. a
+            BucketBatchSampler. It replaces batch_size, shuffle and
+            include_smaller. Defaults to None.
+        rank (int): Rank of this process among world_size processes that
+            share the dataset. With several ranks, a (batch) sampler with a
+            state_dict is seeded with the shared seed. Defaults to 0.
+        world_size (int): Number of processes that share the dataset.
+            Every rank gets a disjoint part of equal length. Defaults to 1.
+        seed (int): Seed of the shuffle, shared by all ranks. Every epoch
+            shuffles with (seed, epoch). Defaults to None (a random seed).
+        drop_uneven (bool): Drop the samples that do not divide evenly over
+            the ranks instead of repeating samples to fill up the last
+            ranks. Defaults to False.
+        sampler (Sampler): Decides the order of the samples instead of
+            shuffle, e.g. a WeightedRandomSampler or ClassBalancedSampler,
+            see samplers.py. With an InfiniteSampler the loader has no
+            length and never stops. Defaults to None.
 
     """
 
@@ -24,25 +103,97 @@ class BatchLoader:
         batch_size: int = 10,
         shuffle: bool = False,
         include_smaller: bool = True,
+        num_workers: int = 0,
+        prefetch_factor: int = 2,
+        executor: str = "thread",
+        collator: Callable = None,
+        batch_sampler: Iterable = None,
+        rank: int = 0,
+        world_size: int = 1,
+        seed: int = None,
+        drop_uneven: bool = False,
+        sampler: Iterable = None,
     ) -> None:
         """
         Initialize the BatchLoader instance.
 
         Args:
-            data (np.ndarray): The input data to be batch-loaded.
+            data (np.ndarray): The input data to be batch-loaded, a sequence
+                or a Dataset.
             batch_size (int, optional): Size of each batch. Defaults to 10.
             shuffle (bool, optional): Whether to shuffle the data before
                 creating batches. Defaults to False.
             include_smaller (bool, optional): Whether to include a smaller
                 batch for the remaining data when len(data) is not divisible
                 by batch_size. Defaults to True.
+            num_workers (int, optional): Number of workers that build
+                batches in the background. Defaults to 0.
+            prefetch_factor (int, optional): Number of batches every worker
+                builds ahead. Defaults to 2.
+            executor (str, optional): "thread" or "process" workers.
+                Defaults to "thread".
+            collator (Callable, optional): Called with every batch, e.g. a
+                Collator. It runs in the consumer, so it can reuse its
+                buffers. Defaults to None.
+            batch_sampler (Iterable, optional): Yields the indices of every
+                batch and replaces batch_size, shuffle and include_smaller.
+                It is iterated once per epoch. Defaults to None.
+            rank (int, optional): Rank of this process. Defaults to 0.
+            world_size (int, optional): Number of processes that share the
+                dataset. Defaults to 1.
+            seed (int, optional): Seed of the shuffle, the same on every
+                rank. Defaults to None (a random seed, only for a single
+                process).
+            drop_uneven (bool, optional): Drop the samples that do not
+                divide evenly over the ranks instead of repeating samples.
+                Defaults to False.
+            sampler (Iterable, optional): Computes the indices of every
+                epoch with indices(epoch) and replaces shuffle. The indices
+                are split over the ranks like shuffled indices. Defaults to
+                None.
         """
+        if num_workers < 0:
+            raise TypeError("num_workers has to be positive.")
+        if prefetch_factor < 1:
+            raise TypeError("prefetch_factor has to be at least 1.")
+        if executor not in ["thread", "process"]:
+            raise NameError("executor has to be one of 'thread' or 'process'")
+        if world_size < 1:
+            raise TypeError("world_size has to be at least 1.")
+        if rank < 0 or rank >= world_size:
+            raise TypeError("rank has to be between 0 and world_size - 1.")
+        if world_size > 1 and seed is None:
+            raise TypeError("Ranks need a shared seed to split the data.")
+        if sampler is not None and (shuffle or batch_sampler is not None):
+            raise TypeError("sampler replaces shuffle and batch_sampler.")
         self.data = data
         self._batch_size = batch_size
         self._include_smaller = include_smaller
         self._shuffle = shuffle
-        self._indices = np.arange(len(data))
         self._current_batch = 0
+        self._num_workers = num_workers
+        self._prefetch_factor = prefetch_factor
+        self._executor = executor
+        self._collator = collator
+        self._batch_sampler = batch_sampler
+        self._sampled_batches = None
+        self._pool = None
+        self._pending = deque()
+        self._next_submitted = 0
+        self._wait_stats = {"batches": 0, "seconds": 0.0}
+        self._rank = rank
+        self._world_size = world_size
+        self._seed = seed if seed is not None else np.random.randint(2**31)
+        self._drop_uneven = drop_uneven
+        self._sampler = sampler
+        # an infinite sampler is read by position instead of by epoch
+        self._infinite = hasattr(sampler, "positions")
+        self._epoch = 0
+        self._epoch_finished = False
+        self._resume_batch = 0
+        self._share_seed(batch_sampler)
+        self._share_seed(sampler)
+        self._indices = self._epoch_indices()
 
     def __len__(self) -> int:
         """
@@ -50,7 +201,16 @@ class BatchLoader:
 
         Returns:
             int: Number of batches.
+
+        Raises:
+            TypeError: If the sampler is infinite.
         """
+        if self._infinite:
+            raise TypeError("A loader with an infinite sampler has no length.")
+        if self._batch_sampler is not None:
+            if self._sampled_batches is not None:
+                return len(self._sampled_batches)
+            return self._rank_length(len(self._batch_sampler))
         if self._include_smaller:
             return len(self._indices) // self._batch_size + (
                 1 if len(self._indices) % self._batch_size != 0 else 0
@@ -60,42 +220,307 @@ class BatchLoader:
 
     def __next__(self) -> List[np.ndarray]:
         """
-        Return the next batch of data.
+        Return the next batch of data. With workers the batch was usually
+        built in the background already.
 
         Returns:
-            List[np.ndarray]: The next batch of data.
+            List[np.ndarray]: The next batch of data, an np.ndarray if data
+                is an np.ndarray.
         """
-        if self._current_batch >= len(self):
+        if self._current_batch >= self._num_batches():
+            self.close()
+            if not self._epoch_finished:
+                # the next pass reshuffles with the next epoch
+                self._epoch += 1
+                self._epoch_finished = True
             raise StopIteration
 
-        start = self._current_batch * self._batch_size
-        end = start + self._batch_size
-        if end > len(self.data):
-            end = len(self.data)
-        batch_indices = self._indices[start:end]
-        batch_data = [self.data[i] for i in batch_indices]
+        self._resume_batch = 0
+        start = time.perf_counter()
+        if self._num_workers == 0:
+            batch_data = _gather(
+                self.data, self._batch_indices(self._current_batch)
+            )
+        else:
+            self._fill_queue()
+            batch_data = self._pending.popleft().result()
+        self._wait_stats["batches"] += 1
+        self._wait_stats["seconds"] += time.perf_counter() - start
         self._current_batch += 1
+        if self._collator is not None:
+            batch_data = self._collator(batch_data)
         return batch_data
 
     def __iter__(self) -> "BatchLoader":
         """
-        Initialize the iterator.
+        Initialize the iterator for the current epoch: shuffle the indices
+        and take the part of this rank.
 
         Returns:
             BatchLoader: Iterator object.
         """
-        self._current_batch = 0
+        self.close()
+        # a loaded state resumes at its batch instead of the first one
+        self._current_batch = self._resume_batch
+        self._resume_batch = 0
+        self._next_submitted = self._current_batch
+        self._epoch_finished = False
+        self._indices = self._epoch_indices()
+        if self._batch_sampler is not None:
+            if hasattr(self._batch_sampler, "set_epoch"):
+                self._batch_sampler.set_epoch(self._epoch)
+            batches = [np.asarray(batch) for batch in self._batch_sampler]
+            positions = self._partition(np.arange(len(batches)))
+            self._sampled_batches = [batches[i] for i in positions]
         return self
 
+    def set_epoch(self, epoch: int) -> None:
+        """
+        Set the epoch the next pass uses. All ranks shuffle with the same
+        (seed, epoch), so they have to be in the same epoch.
+
+        Args:
+            epoch (int): The epoch.
+        """
+        self._epoch = epoch
+
+    def state_dict(self) -> dict:
+        """
+        Return the position of the loader, so that a restarted job can
+        continue with the next batch. The order of an epoch only depends on
+        the seed and the epoch, so these two are the whole random state.
+
+        Returns:
+            dict: Epoch, number of batches consumed in the epoch, seed,
+                rank, world size and the state of the batch sampler.
+        """
+        state = {
+            "epoch": self._epoch,
+            "cursor": 0 if self._epoch_finished else self._current_batch,
+            "seed": int(self._seed),
+            "rank": self._rank,
+            "world_size": self._world_size,
+        }
+        if hasattr(self._batch_sampler, "state_dict"):
+            state["batch_sampler"] = self._batch_sampler.state_dict()
+        if hasattr(self._sampler, "state_dict"):
+            state["sampler"] = self._sampler.state_dict()
+        return state
+
+    def load_state_dict(self, state: dict) -> None:
+        """
+        Continue from a state returned by state_dict. The next pass starts
+        at the saved batch; the batches before it are not built again.
+
+        Args:
+            state (dict): A state returned by state_dict.
+
+        Raises:
+            TypeError: If the state belongs to another rank or world size.
+        """
+        if (state["rank"], state["world_size"]) != (
+            self._rank,
+            self._world_size,
+        ):
+            raise TypeError("The state belongs to another rank or world size.")
+        self.close()
+        if "batch_sampler" in state:
+            self._batch_sampler.load_state_dict(state["batch_sampler"])
+        if "sampler" in state:
+            self._sampler.load_state_dict(state["sampler"])
+        self._seed = state["seed"]
+        self._epoch = state["epoch"]
+        iter(self)
+        self._current_batch = state["cursor"]
+        self._next_submitted = self._current_batch
+        self._resume_batch = state["cursor"]
+
+    def _epoch_indices(self) -> np.ndarray:
+        """
+        Return the indices of this rank for the current epoch.
+
+        Returns:
+            np.ndarray: Indices into data.
+        """
+        if self._infinite:
+            return np.zeros(0, dtype=np.int64)
+        if self._sampler is not None:
+            indices = np.asarray(self._sampler.indices(self._epoch))
+        elif self._shuffle:
+            rng = np.random.default_rng([self._seed, self._epoch])
+            indices = rng.permutation(len(self.data))
+        else:
+            indices = np.arange(len(self.data))
+        return self._partition(indices)
+
+    def _share_seed(self, sampler: Iterable) -> None:
+        """
+        Give a sampler the shared seed of the loader. A sampler seeds
+        itself at random when it is created without a seed, and ranks with
+        different seeds would split different orders of the data, so with
+        several ranks every sampler with a state uses the loader's seed.
+
+        Args:
+            sampler (Iterable): A batch sampler or a sampler, or None.
+        """
+        if self._world_size > 1 and hasattr(sampler, "load_state_dict"):
+            state = sampler.state_dict()
+            state["seed"] = int(self._seed)
+            sampler.load_state_dict(state)
+
+    def _num_batches(self) -> float:
+        """
+        Return the number of batches of an epoch, infinite for an infinite
+        sampler.
+
+        Returns:
+            float: Number of batches.
+        """
+        if self._infinite:
+            return float("inf")
+        return len(self)
+
+    def _partition(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Return the part of this rank. Every rank takes every world_size-th
+        index, after the indices are cut or padded to a multiple of
+        world_size, so all ranks get the same number of indices.
+
+        Args:
+            indices (np.ndarray): Indices of all ranks.
+
+        Returns:
+            np.ndarray: Indices of this rank.
+        """
+        if self._world_size == 1:
+            return indices
+        per_rank = self._rank_length(len(indices))
+        total = per_rank * self._world_size
+        if total > len(indices):
+            # repeat indices from the start to fill up the last ranks
+            indices = np.resize(indices, total)
+        return indices[self._rank : total : self._world_size]
+
+    def _rank_length(self, length: int) -> int:
+        """
+        Return the number of items every rank gets out of length items.
+
+        Args:
+            length (int): Number of items of all ranks.
+
+        Returns:
+            int: Number of items per rank.
+        """
+        if self._drop_uneven:
+            return length // self._world_size
+        return -(-length // self._world_size)
+
+    def _batch_indices(self, batch_number: int) -> np.ndarray:
+        """
+        Return the indices of a batch.
+
+        Args:
+            batch_number (int): Number of the batch.
+
+        Returns:
+            np.ndarray: Indices of the batch.
+        """
+        if self._batch_sampler is not None:
+            if self._sampled_batches is None:
+                iter(self)
+            return self._sampled_batches[batch_number]
+        if self._infinite:
+            # the ranks take turns on the batches of the stream
+            start = (
+                batch_number * self._world_size + self._rank
+            ) * self._batch_size
+            return self._sampler.positions(start, start + self._batch_size)
+        start = batch_number * self._batch_size
+        end = start + self._batch_size
+        if end > len(self._indices):
+            end = len(self._indices)
+        return self._indices[start:end]
+
+    def _fill_queue(self) -> None:
+        """
+        Submit batches to the workers until num_workers * prefetch_factor
+        batches are queued or every batch is submitted.
+        """
+        if self._pool is None:
+            if self._executor == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self._num_workers)
+            else:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._num_workers,
+                    initializer=_init_worker,
+                    initargs=(self.data,),
+                )
+            self._next_submitted = self._current_batch
+        queue_size = self._num_workers * self._prefetch_factor
+        while (
+            len(self._pending) < queue_size
+            and self._next_submitted < self._num_batches()
+        ):
+            self._pending.append(self._submit(self._next_submitted))
+            self._next_submitted += 1
+
+    def _submit(self, batch_number: int) -> Future:
+        """
+        Submit a batch to the workers.
+
+        Args:
+            batch_number (int): Number of the batch.
+
+        Returns:
+            Future: The batch that is being built.
+        """
+        indices = self._batch_indices(batch_number)
+        if self._executor == "thread":
+            return self._pool.submit(_gather, self.data, indices)
+        return self._pool.submit(_gather_in_worker, indices)
+
+    def close(self) -> None:
+        """
+        Stop the workers and drop the batches they built ahead.
+        """
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
     def create_batches(self) -> List[List[np.ndarray]]:
         """
-        Create all batches and return them as a list.
+        Create all batches of the current epoch and return them as a list.
+        With shuffle, every call returns the next epoch in a new order.
+        A collator reuses its buffers for every batch, so collated batches
+        are copied before they are kept.
 
         Returns:
             List[List[np.ndarray]]: List of batches.
         """
-        if self._shuffle:
-            np.random.shuffle(self._indices)
-
+        if self._collator is not None:
+            return [deepcopy(batch) for batch in self]
         batches = [batch for batch in self]
         return batches
+
+    def load_report(self) -> dict:
+        """
+        Report how long the consumer waited for batches. A wait close to
+        zero means the workers keep up, a long wait means loading the data
+        is the bottleneck.
+
+        Returns:
+            dict: Number of batches, seconds spent waiting, seconds per
+                batch, number of workers and prefetch factor.
+        """
+        batches = self._wait_stats["batches"]
+        seconds = self._wait_stats["seconds"]
+        return {
+            "batches": batches,
+            "wait_seconds": seconds,
+            "wait_per_batch": seconds / batches if batches > 0 else 0.0,
+            "num_workers": self._num_workers,
+            "prefetch_factor": self._prefetch_factor,
+        }
@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+from typing import List
+
+from abc_dataset import Dataset
+from abc_preprocessing import PreProcessingTechnique
+
+sys.path.append(os.getcwd() + "/src/")
+
+
+def worker_scaling(
+    dataset_class: type, worker_counts: List[int], **dataset_kwargs
+) -> List[dict]:
+    """Builds the same eager dataset once for every worker count and\
+        reports how the decoding throughput scales.
+
+    use case:
+        worker_scaling(ClassificationDataset, [1, 4, 16],
+                       data_path="chess_data", data_type="image",
+                       labels=True, dataset_format="hierarchical")
+
+    Args:
+        dataset_class (type): ClassificationDataset or RegressionDataset.
+        worker_counts (List[int]): Worker counts to try.
+        **dataset_kwargs: Arguments for the dataset constructor, without\
+            num_workers.
+
+    Returns:
+        List[dict]: One load report per worker count, with the speedup\
+        relative to the first worker count added.
+    """
+    reports = []
+    for num_workers in worker_counts:
+        dataset: Dataset = dataset_class(
+            num_workers=num_workers, **dataset_kwargs
+        )
+        reports.append(dataset.load_report())
+
+    baseline = reports[0]["files_per_second"] if reports else 0.0
+    for report in reports:
+        report["speedup"] = (
+            report["files_per_second"] / baseline if baseline > 0 else 0.0
+        )
+    return reports
+
+
+def getitem_latency(dataset: Dataset, repeats: int = 3) -> dict:
+    """Measures the time per __getitem__ call with deep copies and with\
+        zero-copy views on the same dataset.
+
+    Args:
+        dataset (Dataset): Dataset to read from. Its zero_copy flag is\
+            restored afterwards.
+        repeats (int, optional): Number of passes over the dataset per\
+            mode. Defaults to 3.
+
+    Returns:
+        dict: Seconds per item for both modes and the speedup of zero-copy.
+    """
+    original_mode = dataset.zero_copy
+    latencies = {}
+    for mode, zero_copy in (("copy", False), ("zero_copy", True)):
+        dataset.zero_copy = zero_copy
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for index in range(len(dataset)):
+                dataset[index]
+        latencies[mode] = (time.perf_counter() - start) / (
+            repeats * max(len(dataset), 1)
+        )
+    dataset.zero_copy = original_mode
+
+    latencies["speedup"] = (
+        latencies["copy"] / latencies["zero_copy"]
+        if latencies["zero_copy"] > 0
+        else 0.0
+    )
+    return latencies
+
+
+def decode_benchmark(
+    dataset: Dataset, pipeline: PreProcessingTechnique
+) -> dict:
+    """Compares a preprocessing pipeline on a lazy dataset, where leading\
+        steps are pushed into decoding, with decoding every file in full\
+        first and preprocessing afterwards.
+
+    Args:
+        dataset (Dataset): A lazy dataset.
+        pipeline (PreProcessingTechnique): A preprocessing step or a\
+            SequentialPreprocessing.
+
+    Returns:
+        dict: Seconds and peak traced memory in bytes for the "fused" and\
+        the "full" decode.
+    """
+    if dataset.lazy is False:
+        raise TypeError("decode_benchmark needs a lazy dataset.")
+
+    def full_decode() -> Dataset:
+        eager_dataset = deepcopy(dataset)
+        eager_dataset.data = eager_dataset._if_lazy(eager_dataset.data)
+        eager_dataset.lazy = False
+        return pipeline(eager_dataset)
+
+    results = {}
+    for mode, run in (
+        ("fused", lambda: pipeline(dataset)),
+        ("full", full_decode),
+    ):
+        tracemalloc.start()
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[mode] = {"seconds": seconds, "peak_bytes": peak}
+    return results
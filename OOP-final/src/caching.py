@@ -0,0 +1,424 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Tuple
+
+import numpy as np
+
+sys.path.append(os.getcwd() + "/src/")
+
+# share of max_bytes a full disk cache is trimmed down to, so that the
+# entries are listed once per filled headroom and not on every store
+EVICTION_LOW_WATER = 0.9
+
+
+class DiskCache:
+    """A persistent cache of decoded datapoints. Every entry is a raw .npy\
+        file that is memory-mapped when it is read back, so a cache hit\
+        costs no decoding and no copy.
+
+    Entries live in one subfolder per source file. The entry name is a hash\
+    of the source mtime, size and the decode parameters, so an entry goes\
+    stale as soon as the source file changes and is removed the next time\
+    the source is stored. When the cache grows bigger than max_bytes, least\
+    recently used entries are evicted until it is down to\
+    EVICTION_LOW_WATER of max_bytes.
+
+    The cache can be shared by the threads of a worker pool: the size\
+    accounting and the eviction run under a lock, and entries that another\
+    thread or process removes during a scan are skipped. Process workers\
+    keep their own count, call refresh() to count the entries on disk again.
+
+    Attributes:
+        _cache_dir (str): Folder where the entries are stored.
+        _max_bytes (int): Size cap of the cache in bytes, None for no cap.
+        _current_bytes (int): Size of the cache in bytes.
+        _lock (threading.RLock): Guards the size and the eviction.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = None) -> None:
+        """Initialize the disk cache.
+
+        Args:
+            cache_dir (str): Folder where the entries are stored. It is\
+                created if it does not exist.
+            max_bytes (int, optional): Size cap of the cache in bytes.\
+                Defaults to None (no cap).
+        """
+        if max_bytes is not None and max_bytes < 0:
+            raise TypeError("max_bytes has to be positive.")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self.refresh()
+
+    def __getstate__(self) -> dict:
+        """Copies and pickles leave out the lock, which can't be pickled."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Rebuild the cache from a pickled state with a new lock."""
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def refresh(self) -> None:
+        """Counts the size of the entries on disk again and evicts entries\
+            if the cache is over max_bytes, e.g. after process workers\
+            stored entries that this process did not count."""
+        with self._lock:
+            self._current_bytes = sum(size for _, size, _ in self._entries())
+            if (
+                self._max_bytes is not None
+                and self._current_bytes > self._max_bytes
+            ):
+                self._evict()
+
+    def load(
+        self, filename: str, params: tuple
+    ) -> Tuple[np.array, int] | None:
+        """Looks up the decoded version of a file.
+
+        Args:
+            filename (str): Path to the source file.
+            params (tuple): Parameters the file was decoded with.
+
+        Returns:
+            Tuple[np.array, int] | None: The memory-mapped array and the\
+            sampling rate (None for images), or None on a cache miss.
+        """
+        entry_path = self._entry_path(filename, params)
+        try:
+            array = np.load(entry_path + ".npy", mmap_mode="r")
+            with open(entry_path + ".json") as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+        # touching the entry marks it as recently used for the eviction
+        os.utime(entry_path + ".npy")
+        return array, meta["sampling_rate"]
+
+    def store(
+        self,
+        filename: str,
+        params: tuple,
+        array: np.array,
+        sampling_rate: int = None,
+    ) -> None:
+        """Stores the decoded version of a file and removes stale entries\
+            of the same file.
+
+        Args:
+            filename (str): Path to the source file.
+            params (tuple): Parameters the file was decoded with.
+            array (np.array): Decoded data.
+            sampling_rate (int, optional): Sampling rate of audio data.\
+                Defaults to None.
+        """
+        entry_path = self._entry_path(filename, params)
+        source_dir = os.path.dirname(entry_path)
+        os.makedirs(source_dir, exist_ok=True)
+        with self._lock:
+            self._remove_stale(filename, source_dir)
+
+        # write to temporary files first, so that concurrent readers never
+        # see a half written entry
+        temporary_path = (
+            f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        with open(temporary_path, "wb") as array_file:
+            np.save(array_file, np.ascontiguousarray(array))
+        with open(temporary_path + ".json", "w") as meta_file:
+            json.dump(
+                {
+                    **self._fingerprint(filename),
+                    "sampling_rate": sampling_rate,
+                },
+                meta_file,
+            )
+        with self._lock:
+            # a rewritten entry replaces its old size instead of adding to it
+            try:
+                previous_bytes = os.path.getsize(entry_path + ".npy")
+            except FileNotFoundError:
+                previous_bytes = 0
+            os.replace(temporary_path + ".json", entry_path + ".json")
+            os.replace(temporary_path, entry_path + ".npy")
+            self._current_bytes += (
+                os.path.getsize(entry_path + ".npy") - previous_bytes
+            )
+            if self._max_bytes is not None:
+                if self._current_bytes > self._max_bytes:
+                    self._evict()
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        with self._lock:
+            for entry_path, _, _ in self._entries():
+                self._remove_entry(entry_path)
+            self._current_bytes = 0
+
+    def _entry_path(self, filename: str, params: tuple) -> str:
+        """Path of an entry without the file extension.
+
+        Args:
+            filename (str): Path to the source file.
+            params (tuple): Parameters the file was decoded with.
+
+        Returns:
+            str: Path of the entry.
+        """
+        source_key = hashlib.sha1(
+            os.path.abspath(filename).encode()
+        ).hexdigest()
+        fingerprint = self._fingerprint(filename)
+        version_key = hashlib.sha1(
+            repr(
+                (fingerprint["mtime_ns"], fingerprint["size"], params)
+            ).encode()
+        ).hexdigest()
+        return os.path.join(self._cache_dir, source_key, version_key)
+
+    def _fingerprint(self, filename: str) -> dict:
+        """Stat information that identifies a version of a source file.
+
+        Args:
+            filename (str): Path to the source file.
+
+        Returns:
+            dict: mtime in nanoseconds and size of the file.
+        """
+        stat = os.stat(filename)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def _remove_stale(self, filename: str, source_dir: str) -> None:
+        """Removes the entries of a source file that was changed since\
+            they were written.
+
+        Args:
+            filename (str): Path to the source file.
+            source_dir (str): Folder with the entries of the source file.
+        """
+        fingerprint = self._fingerprint(filename)
+        for entry in os.scandir(source_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path) as meta_file:
+                    meta = json.load(meta_file)
+            except (OSError, ValueError):
+                continue
+            if (meta["mtime_ns"], meta["size"]) != (
+                fingerprint["mtime_ns"],
+                fingerprint["size"],
+            ):
+                entry_path = entry.path[: -len(".json")]
+                self._current_bytes -= self._remove_entry(entry_path)
+
+    def _entries(self) -> list:
+        """Lists the entries of the cache.
+
+        Returns:
+            list: (entry path, size in bytes, last use) for every entry.
+        """
+        entries = []
+        for source_dir in os.scandir(self._cache_dir):
+            if not source_dir.is_dir():
+                continue
+            try:
+                source_entries = list(os.scandir(source_dir.path))
+            except FileNotFoundError:
+                continue
+            for entry in source_entries:
+                if entry.name.endswith(".npy"):
+                    # another process may remove the entry during the scan
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append(
+                        (
+                            entry.path[: -len(".npy")],
+                            stat.st_size,
+                            stat.st_mtime_ns,
+                        )
+                    )
+        return entries
+
+    def _evict(self) -> None:
+        """Removes least recently used entries until the cache is down to\
+            EVICTION_LOW_WATER of max_bytes. Listing the entries stats every\
+            file of the cache, the headroom makes it rare."""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            self._current_bytes = sum(size for _, size, _ in entries)
+            low_water = int(self._max_bytes * EVICTION_LOW_WATER)
+            for entry_path, _, _ in entries:
+                if self._current_bytes <= low_water:
+                    break
+                self._current_bytes -= self._remove_entry(entry_path)
+
+    def _remove_entry(self, entry_path: str) -> int:
+        """Removes a single entry.
+
+        Args:
+            entry_path (str): Path of the entry without the file extension.
+
+        Returns:
+            int: Number of bytes that were freed.
+        """
+        freed = 0
+        try:
+            freed = os.path.getsize(entry_path + ".npy")
+            os.remove(entry_path + ".npy")
+        except FileNotFoundError:
+            pass
+        try:
+            os.remove(entry_path + ".json")
+        except FileNotFoundError:
+            pass
+        return freed
+
+    @property
+    def current_bytes(self) -> int:
+        """Getter for the size of the cache.
+
+        Returns:
+            int: Size of the cache in bytes.
+        """
+        return self._current_bytes
+
+
+class MemoryCache:
+    """An in-process least recently used cache of decoded datapoints with a\
+        budget in bytes instead of a number of entries, since image and\
+        audio arrays differ a lot in size.
+
+    Attributes:
+        _max_bytes (int): Memory budget of the cache in bytes.
+        _entries (OrderedDict): Cached datapoints, least recently used first.
+        _current_bytes (int): Bytes held by the cached datapoints.
+        hits (int): Number of lookups that found their datapoint.
+        misses (int): Number of lookups that did not find their datapoint.
+        evictions (int): Number of datapoints removed to stay in budget.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialize the memory cache.
+
+        Args:
+            max_bytes (int): Memory budget of the cache in bytes.
+        """
+        if max_bytes < 0:
+            raise TypeError("max_bytes has to be positive.")
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached datapoints."""
+        return len(self._entries)
+
+    def __getstate__(self) -> dict:
+        """Copies and pickles of the cache start empty, the cached arrays\
+            and the lock are not worth sending to another process."""
+        return {"_max_bytes": self._max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        """Rebuild an empty cache from a pickled state."""
+        self.__init__(state["_max_bytes"])
+
+    def get(self, key: str) -> Any:
+        """Looks up a datapoint and marks it as recently used.
+
+        Args:
+            key (str): Key of the datapoint, usually its path.
+
+        Returns:
+            Any: The datapoint or None on a cache miss.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key: str, value: Any) -> None:
+        """Caches a datapoint and evicts the least recently used ones\
+            until the cache fits its budget. Datapoints bigger than the\
+            whole budget are not cached.
+
+        Args:
+            key (str): Key of the datapoint, usually its path.
+            value (Any): An array or an (array, sampling rate) tuple.
+        """
+        size = self._nbytes(value)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._current_bytes += size
+            while self._current_bytes > self._max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes every datapoint from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def info(self) -> dict:
+        """Reports the counters of the cache.
+
+        Returns:
+            dict: hits, misses, evictions, number of entries, bytes in use\
+            and the budget.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self._max_bytes,
+            }
+
+    def _nbytes(self, value: Any) -> int:
+        """Size of a datapoint in bytes.
+
+        Args:
+            value (Any): An array or an (array, sampling rate) tuple.
+
+        Returns:
+            int: Number of bytes held by the arrays of the datapoint.
+        """
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, tuple):
+            return sum(self._nbytes(part) for part in value)
+        return 0
+
+    @property
+    def current_bytes(self) -> int:
+        """Getter for the bytes held by the cached datapoints.
+
+        Returns:
+            int: Size of the cache in bytes.
+        """
+        return self._current_bytes
@@ -3,6 +3,8 @@ import sys
 
 from abc_dataset import Dataset
 from custom_errors import NoCSVPathError
+from directory_scanner import DirectoryScanner
+from label_encoder import LabelEncoder
 
 sys.path.append(os.getcwd() + "/src/")
 
@@ -15,10 +17,22 @@ class ClassificationDataset(Dataset):
         with each subfolder containing the data for a single class. In the\
         given configuration, you don't need a file with labels, since the\
         labels are already encoded in the folder hierarchy (via the folder\
-         names).
+         names). The hierarchy is listed in a single pass, and with a\
+         manifest_path the listing is kept in a manifest so that later\
+         constructions only scan the class folders that changed.
 
+    A csv file is parsed once, csv_chunksize rows at a time, and its labels\
+    are kept as a numpy array of strings. With encode_labels the labels are\
+    stored as compact integer codes instead, the class names are kept in\
+    label_encoder.classes_. With contiguous eager images are stored in one\
+    block of memory instead of a list of arrays. max_memory_bytes caps the\
+    memory of an eager dataset, the samples that do not fit are decoded on\
+    access. max_concurrency limits how many datapoints the async API\
+    (aget, aget_batch and async for) reads at the same time.
     """
 
+    _csv_label_dtype = str
+
     def __init__(
         self,
         data_path: str,
@@ -27,6 +41,19 @@ class ClassificationDataset(Dataset):
         dataset_format: str,
         lazy: bool = False,
         csv_path: str = None,
+        num_workers: int = 1,
+        executor: str = "thread",
+        cache_dir: str = None,
+        cache_max_bytes: int = None,
+        memory_cache_bytes: int = None,
+        zero_copy: bool = False,
+        sample_rate: int | str = 22050,
+        manifest_path: str = None,
+        csv_chunksize: int = 100000,
+        contiguous: bool = False,
+        max_memory_bytes: int = None,
+        max_concurrency: int = 8,
+        encode_labels: bool = False,
     ) -> None:
         if dataset_format not in ["csv", "hierarchical"]:
             raise NameError(
@@ -35,10 +62,33 @@ class ClassificationDataset(Dataset):
         if dataset_format == "csv" and csv_path is None:
             raise NoCSVPathError(csv_path)
 
-        super().__init__(data_path, data_type, labels, csv_path, lazy)
+        super().__init__(
+            data_path,
+            data_type,
+            labels,
+            csv_path,
+            lazy,
+            num_workers=num_workers,
+            executor=executor,
+            cache_dir=cache_dir,
+            cache_max_bytes=cache_max_bytes,
+            memory_cache_bytes=memory_cache_bytes,
+            zero_copy=zero_copy,
+            sample_rate=sample_rate,
+            csv_chunksize=csv_chunksize,
+            contiguous=contiguous,
+            max_memory_bytes=max_memory_bytes,
+            max_concurrency=max_concurrency,
+        )
         self._dataset_format = dataset_format
+        self._manifest_path = manifest_path
+
+        self.label_encoder = None
 
         self.data, self.labels = self._create_data_object()
+        if encode_labels is True and self.labels is not None:
+            self.label_encoder = LabelEncoder()
+            self.labels = self.label_encoder.fit_transform(self.labels)
 
     def _create_data_object(self) -> None:
         """_create_data_object() is a private helper method that initialises\
@@ -49,8 +99,7 @@ class ClassificationDataset(Dataset):
             data, labels = self._create_data_from_hierarchical()
             return data, labels
         elif self._dataset_format == "csv":
-            data = super()._create_data_from_csv()
-            labels = super()._create_labels_from_csv()
+            data, labels = super()._create_data_from_csv()
             return data, labels
 
     def _create_data_from_hierarchical(self) -> list:
@@ -62,38 +111,13 @@ class ClassificationDataset(Dataset):
             List: a list consisting of the data entries that are retireved\
             from the files
         """
-        # assign data directory
-        directory = self._root
-        labels = []
-        data = []
-
-        # this loops through every class directory and adds its labels
-        for class_name in os.listdir(directory):
-            if os.path.isdir(
-                os.path.join(directory, class_name)
-            ):  # performs the loop only on directories
-                # reasigning the path to the class_folder
-                class_folder_path = os.path.join(directory, str(class_name))
-                # create the numpy arrays out of all
-                # pictures in the class_folder
-                class_data = super()._create_data_from_folder(
-                    class_folder_path
-                )
-                # add the image (numpy array) info to the
-                # dataset for the given class
-                data = data + class_data
-                # if the user set the labels_bool to True,
-                # eject the corresponding labels
-                if self._labels_bool is True:
-                    number_of_files = len(
-                        [
-                            file
-                            for file in os.listdir(class_folder_path)
-                            if file != ".DS_Store"
-                        ]
-                    )
-                    # num_of_entries = len(os.listdir(class_folder_path))
-                    labels.extend([class_name] * number_of_files)
-                else:
-                    labels = None
+        scanner = DirectoryScanner(self._root, self._manifest_path)
+        files = scanner.scan()
+        filepaths = [path for path, _, _, _ in files]
+        # data and labels come from the same listing, so they stay aligned
+        if self._labels_bool is True:
+            labels = [label for _, label, _, _ in files]
+        else:
+            labels = None
+        data = self._create_data_from_paths(filepaths, labels)
         return data, labels
@@ -0,0 +1,180 @@
+import os
+import sys
+from typing import List, Tuple
+
+import numpy as np
+
+sys.path.append(os.getcwd() + "/src/")
+
+
+class Collator:
+    """Turns a batch (a list of dataset items) into stacked arrays.
+
+    In "stack" mode same-shaped images become one (B, H, W, C) array. In\
+    "pad" mode audio series are padded into one (B, T) array with the\
+    length and the sampling rate of every series next to it. Labels become\
+    an array in both modes.
+
+    The output arrays are views on buffers that are allocated once and\
+    reused (and only grown) for the following batches, so collating does\
+    not allocate per step. A batch is therefore only valid until the next\
+    batch is collated; copy it to keep it longer.
+
+    use case:
+        loader = BatchLoader(dataset, batch_size=8, collator=Collator())
+        images, labels = next(iter(loader))
+
+    Attributes:
+        _mode (str): "stack" or "pad".
+        _pad_value (float): Value the padding is filled with.
+        _buffers (dict): Reused output buffers by name.
+    """
+
+    def __init__(self, mode: str = "stack", pad_value: float = 0.0) -> None:
+        """Initialize the collator.
+
+        Args:
+            mode (str, optional): "stack" for images or "pad" for audio.\
+                Defaults to "stack".
+            pad_value (float, optional): Value the padding is filled with.\
+                Defaults to 0.0.
+        """
+        if mode not in ["stack", "pad"]:
+            raise NameError("mode has to be one of 'stack' or 'pad'")
+        self._mode = mode
+        self._pad_value = pad_value
+        self._buffers = {}
+
+    def __repr__(self) -> str:
+        """__repr__() defines the string representation of the given object.
+
+        use case:
+            collator = Collator()
+            print(collator)
+        """
+        return f"{self.__class__.__name__}(mode={self._mode})"
+
+    def __call__(self, batch: List) -> tuple | np.ndarray:
+        """Collates a batch.
+
+        Args:
+            batch (List): Items of a dataset: images, (series, sampling\
+                rate) tuples, or pairs of these with a label.
+
+        Returns:
+            tuple | np.ndarray: "stack" returns images, or (images, labels).\
+            "pad" returns (audio, lengths, sampling_rates), with labels as\
+            a fourth element if the items have labels.
+        """
+        if self._mode == "stack":
+            return self._stack(batch)
+        return self._pad(batch)
+
+    def _stack(self, batch: List) -> tuple | np.ndarray:
+        """Stacks same-shaped images into one array.
+
+        Args:
+            batch (List): Images or (image, label) pairs.
+
+        Raises:
+            TypeError: If the images have different shapes.
+
+        Returns:
+            tuple | np.ndarray: images, or (images, labels).
+        """
+        has_labels = isinstance(batch[0], tuple)
+        arrays = [item[0] for item in batch] if has_labels else batch
+        shape = arrays[0].shape
+        if any(array.shape != shape for array in arrays):
+            raise TypeError(
+                "stack needs images of one shape, crop them first."
+            )
+        images = self._buffer("data", (len(arrays), *shape), arrays[0].dtype)
+        for row, array in enumerate(arrays):
+            images[row] = array
+        if not has_labels:
+            return images
+        return images, self._labels([item[1] for item in batch])
+
+    def _pad(self, batch: List) -> tuple:
+        """Pads audio series to the longest series of the batch.
+
+        Args:
+            batch (List): (series, sampling rate) tuples or ((series,\
+                sampling rate), label) pairs.
+
+        Returns:
+            tuple: (audio, lengths, sampling_rates), plus labels if the\
+            items have labels.
+        """
+        has_labels = isinstance(batch[0][0], tuple)
+        samples = [item[0] for item in batch] if has_labels else batch
+        lengths = self._buffer("lengths", (len(samples),), np.int64)
+        sampling_rates = self._buffer(
+            "sampling_rates", (len(samples),), np.int64
+        )
+        for row, (series, sampling_rate) in enumerate(samples):
+            lengths[row] = len(series)
+            sampling_rates[row] = sampling_rate
+
+        audio = self._buffer(
+            "data",
+            (len(samples), int(lengths.max(initial=0))),
+            samples[0][0].dtype,
+        )
+        audio.fill(self._pad_value)
+        for row, (series, _) in enumerate(samples):
+            audio[row, : len(series)] = series
+        if not has_labels:
+            return audio, lengths, sampling_rates
+        labels = self._labels([item[1] for item in batch])
+        return audio, lengths, sampling_rates, labels
+
+    def _labels(self, labels: list) -> np.ndarray:
+        """Turns the labels of a batch into an array. Numeric labels are\
+            written into a reused buffer, text labels need a new array.
+
+        Args:
+            labels (list): Labels of the batch.
+
+        Returns:
+            np.ndarray: The labels.
+        """
+        dtype = np.asarray(labels[0]).dtype
+        if dtype.kind not in "biuf":
+            return np.asarray(labels)
+        output = self._buffer("labels", (len(labels),), dtype)
+        output[:] = labels
+        return output
+
+    def _buffer(
+        self, name: str, shape: Tuple[int], dtype: type
+    ) -> np.ndarray:
+        """Returns a view of the given shape on a reused buffer. The buffer\
+            is replaced by a bigger one if it is too small, or if the dtype\
+            or the number of dimensions changed.
+
+        Args:
+            name (str): Name of the buffer.
+            shape (Tuple[int]): Shape of the view.
+            dtype (type): dtype of the buffer.
+
+        Returns:
+            np.ndarray: A view on the buffer.
+        """
+        buffer = self._buffers.get(name)
+        if (
+            buffer is None
+            or buffer.dtype != dtype
+            or buffer.ndim != len(shape)
+            or any(have < need for have, need in zip(buffer.shape, shape))
+        ):
+            if buffer is not None and buffer.ndim == len(shape):
+                shape_to_allocate = tuple(
+                    max(have, need) for have, need in zip(buffer.shape, shape)
+                )
+            else:
+                shape_to_allocate = tuple(shape)
+            buffer = np.empty(shape_to_allocate, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer[tuple(slice(0, size) for size in shape)]
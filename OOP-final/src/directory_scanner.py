@@ -0,0 +1,142 @@
+import json
+import os
+import sys
+from typing import Iterator, List, Tuple
+
+sys.path.append(os.getcwd() + "/src/")
+
+SUPPORTED_EXTENSIONS = frozenset(
+    (".jpg", ".jpeg", ".png", ".gif", ".webp", ".wav", ".mp3")
+)
+
+
+def iter_supported_files(folder: str) -> Iterator[os.DirEntry]:
+    """Yields the supported files of a folder in a single os.scandir pass.\
+        The extension check is a set lookup on the file suffix.
+
+    Args:
+        folder (str): Path to the folder.
+
+    Returns:
+        Iterator[os.DirEntry]: Entries of the supported files.
+    """
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            extension = os.path.splitext(entry.name)[1].lower()
+            if extension in SUPPORTED_EXTENSIONS and entry.is_file():
+                yield entry
+
+
+class DirectoryScanner:
+    """Lists the files of a hierarchical dataset (one subfolder per class)\
+        in a single pass and optionally keeps the listing in a manifest file.
+
+    The manifest stores the path, label, size and mtime of every file and\
+    the mtime of every class folder. When a manifest exists, only the class\
+    folders whose mtime changed are scanned again, the other folders are\
+    taken from the manifest without touching the file system.
+
+    Attributes:
+        _root (str): Root of the hierarchical dataset.
+        _manifest_path (str): Path to the manifest file, None to not keep\
+            a manifest.
+        rescanned (List[str]): Class folders scanned by the last scan.
+    """
+
+    def __init__(self, root: str, manifest_path: str = None) -> None:
+        """Initialize the scanner.
+
+        Args:
+            root (str): Root of the hierarchical dataset.
+            manifest_path (str, optional): Path to the manifest file.\
+                Defaults to None (no manifest).
+        """
+        self._root = root
+        self._manifest_path = manifest_path
+        self.rescanned = []
+
+    def scan(self) -> List[Tuple[str, str, int, int]]:
+        """Lists the supported files of every class folder.
+
+        Returns:
+            List[Tuple[str, str, int, int]]: (path, label, size, mtime_ns)\
+            of every file, class by class in directory order.
+        """
+        manifest = self._load_manifest()
+        directories = {}
+        self.rescanned = []
+        with os.scandir(self._root) as class_entries:
+            for class_entry in class_entries:
+                if not class_entry.is_dir():
+                    continue
+                mtime_ns = class_entry.stat().st_mtime_ns
+                known = manifest.get(class_entry.name)
+                if known is None or known["mtime_ns"] != mtime_ns:
+                    known = {
+                        "mtime_ns": mtime_ns,
+                        "files": self._scan_class(class_entry.path),
+                    }
+                    self.rescanned.append(class_entry.name)
+                directories[class_entry.name] = known
+
+        if self._manifest_path is not None and (
+            self.rescanned or directories.keys() != manifest.keys()
+        ):
+            self._write_manifest(directories)
+
+        return [
+            (os.path.join(self._root, label, name), label, size, mtime_ns)
+            for label, directory in directories.items()
+            for name, size, mtime_ns in directory["files"]
+        ]
+
+    def _scan_class(self, class_path: str) -> List[list]:
+        """Lists the supported files of one class folder.
+
+        Args:
+            class_path (str): Path to the class folder.
+
+        Returns:
+            List[list]: [name, size, mtime_ns] of every file.
+        """
+        files = []
+        for entry in iter_supported_files(class_path):
+            stat = entry.stat()
+            files.append([entry.name, stat.st_size, stat.st_mtime_ns])
+        return files
+
+    def _load_manifest(self) -> dict:
+        """Loads the class folders of the manifest, if it belongs to the\
+            same root.
+
+        Returns:
+            dict: Class folders of the manifest, empty if there is none.
+        """
+        if self._manifest_path is None:
+            return {}
+        try:
+            with open(self._manifest_path) as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("root") != os.path.abspath(self._root):
+            return {}
+        return manifest["directories"]
+
+    def _write_manifest(self, directories: dict) -> None:
+        """Writes the manifest through a temporary file, so that a crash\
+            never leaves a half written manifest.
+
+        Args:
+            directories (dict): Class folders with their mtime and files.
+        """
+        temporary_path = self._manifest_path + ".tmp"
+        with open(temporary_path, "w") as manifest_file:
+            json.dump(
+                {
+                    "root": os.path.abspath(self._root),
+                    "directories": directories,
+                },
+                manifest_file,
+            )
+        os.replace(temporary_path, self._manifest_path)
@@ -4,6 +4,7 @@ import sys
 import numpy as np
 
 # importing from src
+from abc_dataset import Dataset
 from abc_preprocessing import PreProcessingTechnique
 from classification_dataset import ClassificationDataset
 from regression_dataset import RegressionDataset
@@ -32,9 +33,9 @@ class CenterCrop(PreProcessingTechnique):
         self, old_data: ClassificationDataset | RegressionDataset
     ) -> list:
         """_transformation() is an a helper function that deals with\
-            the overall creation of the new preprocessed dataset. It\
-            applies the transformation iteratively to each entry in the\
-            dataset given as an argument.
+            the overall creation of the new preprocessed dataset. Images\
+            stored in one (N, H, W, C) array are cropped with a single\
+            slice, other images one at a time (see apply_batch).
 
         Args:
 
@@ -42,14 +43,37 @@ class CenterCrop(PreProcessingTechnique):
             to be preprocessed
 
         Returns:
-            list: a list that consists of the preprocessed data entries
+            list: a list that consists of the preprocessed data entries, an\
+            np.ndarray if the images are stored in one array
         """
-        new_data = []
-        for image_array in old_data.data:
-            new_image_array = self._center_crop(image_array)
-            new_data.append(new_image_array)
+        return self.apply_batch(old_data.data)
 
-        return new_data
+    def _transform_batch(self, batch: np.ndarray) -> np.ndarray:
+        """Crops same-shaped images with one slice of the (N, H, W, C)\
+            array, so the crop is a view and nothing is copied.
+
+        Args:
+            batch (np.ndarray): Images stacked along the first axis.
+
+        Returns:
+            np.ndarray: The cropped images.
+        """
+        _, original_height, original_width, _ = batch.shape
+        crop_x1, crop_y1, crop_x2, crop_y2 = Dataset._center_crop_box(
+            original_height, original_width, self.height, self.width
+        )
+        return batch[:, crop_y1:crop_y2, crop_x1:crop_x2, :]
+
+    def _transform_item(self, image_array: np.array) -> np.array:
+        """Crops a single image, see _center_crop.
+
+        Args:
+            image_array (np.array): a single original datapoint
+
+        Returns:
+            np.array: the cropped datapoint
+        """
+        return self._center_crop(image_array)
 
     def _center_crop(self, image_array: np.array) -> np.array:
         """_center_crop() is a private helper function which applies a\
@@ -68,20 +92,19 @@ class CenterCrop(PreProcessingTechnique):
         # Get original image size (height, width, rgb colors)
         original_height, original_width, _ = image_array.shape
 
-        # Calculate center coordinates
-        center_x = original_width // 2
-        center_y = original_height // 2
-
         # Calculate crop coordinates
-        crop_x1 = max(center_x - self.width // 2, 0)
-        crop_y1 = max(center_y - self.height // 2, 0)
-        crop_x2 = min(center_x + self.width // 2, original_width)
-        crop_y2 = min(center_y + self.height // 2, original_height)
+        crop_x1, crop_y1, crop_x2, crop_y2 = Dataset._center_crop_box(
+            original_height, original_width, self.height, self.width
+        )
 
         # Perform crop
-        cropped_image = image_array
-        if self.height < original_height:
-            cropped_image = cropped_image[crop_y1:crop_y2, :, :]
-        if self.width < original_width:
-            cropped_image = cropped_image[:, crop_x1:crop_x2, :]
-        return cropped_image
+        return image_array[crop_y1:crop_y2, crop_x1:crop_x2, :]
+
+    def _decode_hint(self) -> dict:
+        """A center crop can be done while decoding an image, so only the\
+            crop is converted to an array.
+
+        Returns:
+            dict: The decode hint of the crop.
+        """
+        return {"center_crop": (self.height, self.width)}
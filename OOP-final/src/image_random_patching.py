@@ -36,9 +36,9 @@ class RandomPatching(PreProcessingTechnique):
         self, old_data: ClassificationDataset | RegressionDataset
     ) -> list:
         """_transformation() is an a helper function that deals with\
-            the overall creation of the new preprocessed dataset. It\
-            applies the transformation iteratively to each entry in the \
-            dataset given as an argument.
+            the overall creation of the new preprocessed dataset. Images\
+            stored in one (N, H, W, C) array are patched in one vectorised\
+            call, other images one at a time (see apply_batch).
 
         Args:
 
@@ -47,17 +47,56 @@ class RandomPatching(PreProcessingTechnique):
 
 
         Returns:
-            list: a list that consists of the preprocessed data entries
+            list: a list that consists of the preprocessed data entries, an\
+            np.ndarray if the images are stored in one array
         """
-        new_data = []
-        for image_array in old_data.data:
-            new_image_array = self._apply_random_patching(image_array)
-            new_data.append(new_image_array)
+        return self.apply_batch(old_data.data)
 
-        if old_data._labels_bool is True:
-            return (new_data, old_data.labels)
-        else:
-            return new_data
+    def _transform_batch(self, batch: np.ndarray) -> np.ndarray:
+        """Patches same-shaped images at once: the top-left corners of all\
+            patches are drawn in one call and the patches are written\
+            through one mask over the (N, H, W) pixels.
+
+        Args:
+            batch (np.ndarray): Images stacked along the first axis.
+
+        Returns:
+            np.ndarray: The patched images, a copy of the batch.
+        """
+        number_of_images, original_height, original_width, _ = batch.shape
+
+        # Sample the top-left (y, x) coordinates of every patch
+        corner_bounds = [
+            original_height - self.height + 1,
+            original_width - self.width + 1,
+        ]
+        corners = np.random.randint(
+            0, corner_bounds, size=(number_of_images, 2)
+        )
+        top_left_y = corners[:, 0, np.newaxis]
+        top_left_x = corners[:, 1, np.newaxis]
+        rows = np.arange(original_height)
+        columns = np.arange(original_width)
+        in_rows = (rows >= top_left_y) & (rows < top_left_y + self.height)
+        in_columns = (columns >= top_left_x) & (
+            columns < top_left_x + self.width
+        )
+        mask = in_rows[:, :, np.newaxis] & in_columns[:, np.newaxis, :]
+
+        patched_batch = np.copy(batch)
+        patched_batch[mask] = self._color_value()
+        return patched_batch
+
+    def _transform_item(self, image_array: np.array) -> np.array:
+        """Patches a single image, see _apply_random_patching.
+
+        Args:
+            image_array (np.array): a single original datapoint
+
+        Returns:
+            np.array: the patched datapoint
+        """
+        return self._apply_random_patching(image_array)
 
     def _apply_random_patching(self, image_array: np.array) -> np.array:
         """_apply_random_patching() is a private helper function which applies\
@@ -82,6 +121,25 @@ class RandomPatching(PreProcessingTechnique):
         # Create a copy of the image array
         patched_image = np.copy(image_array)
 
+        # Fill the patch with the specified color
+
+        patched_image[
+            top_left_y: top_left_y + self.height,
+            top_left_x: top_left_x + self.width,
+            :,
+        ] = self._color_value()
+
+        return patched_image
+
+    def _color_value(self) -> list:
+        """_color_value() returns the RGB value of the patch color.
+
+        Raises:
+            ValueError: if the color is not 'red', 'green' or 'black'.
+
+        Returns:
+            list: the RGB value of the color
+        """
         # Set color based on user input
 
         if self.color == "red":
@@ -94,15 +152,7 @@ class RandomPatching(PreProcessingTechnique):
         else:
             raise ValueError("Invalid color. Use 'red', 'green', or 'black'.")
 
-        # Fill the patch with the specified color
-
-        patched_image[
-            top_left_y: top_left_y + self.height,
-            top_left_x: top_left_x + self.width,
-            :,
-        ] = color
-
-        return patched_image
+        return color
 
     def _check_color(self, color: str) -> None:
         """_checkcolor() is a private helper function which checks\
@@ -0,0 +1,117 @@
+import os
+import sys
+from typing import Sequence
+
+import numpy as np
+
+sys.path.append(os.getcwd() + "/src/")
+
+
+class LabelEncoder:
+    """Maps class names to integer codes. The codes are stored in the\
+        smallest integer dtype that fits the number of classes, so a label\
+        takes two or four bytes instead of a pointer to a string.
+
+    use case:
+        encoder = LabelEncoder()
+        codes = encoder.fit_transform(["cat", "dog", "cat"])
+        encoder.inverse_transform(codes)
+
+    Attributes:
+        classes_ (np.ndarray): Sorted vocabulary of class names, the code of\
+            a class is its position in this array. None before fitting.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an unfitted encoder."""
+        self.classes_ = None
+
+    def __repr__(self) -> str:
+        """__repr__() defines the string representation of the given object.
+
+        use case:
+            encoder = LabelEncoder()
+            print(encoder)
+        """
+        number_of_classes = 0 if self.classes_ is None else len(self.classes_)
+        return f"{self.__class__.__name__}(classes={number_of_classes})"
+
+    def __len__(self) -> int:
+        """Return the number of classes in the vocabulary."""
+        return 0 if self.classes_ is None else len(self.classes_)
+
+    @property
+    def dtype(self) -> type:
+        """Integer dtype of the codes.
+
+        Returns:
+            type: np.int16, or np.int32 for more than 32767 classes.
+        """
+        if len(self) <= np.iinfo(np.int16).max:
+            return np.int16
+        return np.int32
+
+    def fit(self, labels: Sequence) -> "LabelEncoder":
+        """Builds the vocabulary from the labels.
+
+        Args:
+            labels (Sequence): Class names.
+
+        Returns:
+            LabelEncoder: The fitted encoder.
+        """
+        self.classes_ = np.unique(np.asarray(labels))
+        return self
+
+    def fit_transform(self, labels: Sequence) -> np.ndarray:
+        """Builds the vocabulary and encodes the labels in one pass.
+
+        Args:
+            labels (Sequence): Class names.
+
+        Returns:
+            np.ndarray: Integer codes of the labels.
+        """
+        self.classes_, codes = np.unique(
+            np.asarray(labels), return_inverse=True
+        )
+        return codes.astype(self.dtype)
+
+    def transform(self, labels: Sequence) -> np.ndarray:
+        """Encodes class names with the fitted vocabulary.
+
+        Args:
+            labels (Sequence): Class names.
+
+        Raises:
+            TypeError: If the encoder was not fitted.
+            TypeError: If a label is not in the vocabulary.
+
+        Returns:
+            np.ndarray: Integer codes of the labels.
+        """
+        if self.classes_ is None:
+            raise TypeError("LabelEncoder has to be fitted first.")
+        labels = np.asarray(labels)
+        codes = np.searchsorted(self.classes_, labels)
+        codes = np.minimum(codes, len(self.classes_) - 1)
+        unknown = self.classes_[codes] != labels
+        if np.any(unknown):
+            raise TypeError(f"unknown labels: {np.unique(labels[unknown])}")
+        return codes.astype(self.dtype)
+
+    def inverse_transform(self, codes: Sequence[int]) -> np.ndarray:
+        """Decodes integer codes back to class names.
+
+        Args:
+            codes (Sequence[int]): Integer codes.
+
+        Raises:
+            TypeError: If the encoder was not fitted.
+
+        Returns:
+            np.ndarray: Class names of the codes.
+        """
+        if self.classes_ is None:
+            raise TypeError("LabelEncoder has to be fitted first.")
+        return self.classes_[np.asarray(codes)]
@@ -0,0 +1,161 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+import soundfile as sf
+from PIL import Image
+
+sys.path.append(os.getcwd() + "/src/")
+
+IMAGE_COLUMNS = ("height", "width", "bands")
+AUDIO_COLUMNS = ("sampling_rate", "frames", "channels", "duration")
+COLUMN_DTYPES = {
+    "height": np.int32,
+    "width": np.int32,
+    "bands": np.int8,
+    "sampling_rate": np.int32,
+    "frames": np.int64,
+    "channels": np.int16,
+    "duration": np.float64,
+    "file_size": np.int64,
+    "mtime_ns": np.int64,
+}
+
+
+def read_image_header(filename: str) -> tuple:
+    """Reads the size of an image from its header. PIL opens images\
+        lazily, so the pixels are never decoded.
+
+    Args:
+        filename (str): Path to the image.
+
+    Returns:
+        tuple: height, width and number of bands of the image.
+    """
+    with Image.open(filename) as image:
+        return (image.height, image.width, len(image.getbands()))
+
+
+def read_audio_header(filename: str) -> tuple:
+    """Reads the format of an audio file from its header.
+
+    Args:
+        filename (str): Path to the audio file.
+
+    Returns:
+        tuple: sampling rate, number of frames, number of channels and\
+        duration in seconds of the file.
+    """
+    info = sf.info(filename)
+    return (info.samplerate, info.frames, info.channels, info.duration)
+
+
+def _read_header(filename: str, data_type: str) -> tuple:
+    """Reads the header and the stat information of a single file.
+
+    Args:
+        filename (str): Path to the file.
+        data_type (str): "image" or "audio".
+
+    Returns:
+        tuple: The header values followed by file size and mtime.
+    """
+    stat = os.stat(filename)
+    if data_type == "image":
+        header = read_image_header(filename)
+    else:
+        header = read_audio_header(filename)
+    return header + (stat.st_size, stat.st_mtime_ns)
+
+
+def read_metadata(
+    filepaths: List[str], data_type: str, num_workers: int = 8
+) -> dict:
+    """Reads the headers of many files on a thread pool and returns them\
+        as columns.
+
+    Args:
+        filepaths (List[str]): Paths to the files.
+        data_type (str): "image" or "audio".
+        num_workers (int, optional): Number of threads. Defaults to 8.
+
+    Returns:
+        dict: One numpy array per column. Images have height, width and\
+        bands, audio has sampling_rate, frames, channels and duration.\
+        Both have path, file_size and mtime_ns.
+    """
+    columns = _columns(data_type)
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        rows = list(
+            pool.map(lambda path: _read_header(path, data_type), filepaths)
+        )
+
+    metadata = {"path": np.array(filepaths, dtype=str)}
+    for position, column in enumerate(columns):
+        metadata[column] = np.array(
+            [row[position] for row in rows], dtype=COLUMN_DTYPES[column]
+        )
+    return metadata
+
+
+def save_metadata(metadata: dict, cache_path: str) -> None:
+    """Saves metadata columns to an .npz file.
+
+    Args:
+        metadata (dict): Columns returned by read_metadata.
+        cache_path (str): Path to the .npz file.
+    """
+    temporary_path = cache_path + ".tmp.npz"
+    np.savez(temporary_path, **metadata)
+    os.replace(temporary_path, cache_path)
+
+
+def load_metadata(cache_path: str, filepaths: List[str]) -> dict | None:
+    """Loads cached metadata columns, if they still describe the files.
+
+    Args:
+        cache_path (str): Path to the .npz file.
+        filepaths (List[str]): Paths the metadata has to describe.
+
+    Returns:
+        dict | None: The columns, None if there is no cache or a file was\
+        added, removed or changed since the cache was written.
+    """
+    try:
+        with np.load(cache_path) as cached:
+            metadata = {name: cached[name] for name in cached.files}
+    except (OSError, ValueError):
+        return None
+    if metadata["path"].tolist() != list(filepaths):
+        return None
+    for position, filename in enumerate(filepaths):
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        if (
+            stat.st_size != metadata["file_size"][position]
+            or stat.st_mtime_ns != metadata["mtime_ns"][position]
+        ):
+            return None
+    return metadata
+
+
+def _columns(data_type: str) -> tuple:
+    """Names of the header columns of a data type.
+
+    Args:
+        data_type (str): "image" or "audio".
+
+    Returns:
+        tuple: Column names in the order _read_header returns them.
+    """
+    if data_type == "image":
+        header_columns = IMAGE_COLUMNS
+    elif data_type == "audio":
+        header_columns = AUDIO_COLUMNS
+    else:
+        raise NotImplementedError
+    return header_columns + ("file_size", "mtime_ns")
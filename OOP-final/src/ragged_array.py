@@ -0,0 +1,116 @@
+import os
+import sys
+from typing import Iterator, Sequence
+
+import numpy as np
+
+sys.path.append(os.getcwd() + "/src/")
+
+
+class RaggedArray:
+    """A sequence of arrays with different shapes stored in one flat\
+        buffer. An offset and a shape table describe where every array\
+        starts, so indexing returns a view on the buffer and slicing or\
+        fancy indexing returns a RaggedArray that shares the buffer.
+
+    use case:
+        images = RaggedArray.from_shapes([(2, 3, 3), (4, 1, 3)], np.uint8)
+        images[0][:] = 255
+
+    Attributes:
+        buffer (np.ndarray): Flat buffer with all arrays.
+        offsets (np.ndarray): Start of every array in the buffer, in items.
+        shapes (np.ndarray): Shape of every array, one row per array.
+    """
+
+    def __init__(
+        self, buffer: np.ndarray, offsets: np.ndarray, shapes: np.ndarray
+    ) -> None:
+        """Initialize the sequence on an existing buffer.
+
+        Args:
+            buffer (np.ndarray): Flat buffer with all arrays.
+            offsets (np.ndarray): Start of every array in the buffer.
+            shapes (np.ndarray): Shape of every array, one row per array.
+        """
+        self.buffer = buffer
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.shapes = np.asarray(shapes, dtype=np.int64)
+
+    @classmethod
+    def from_shapes(
+        cls, shapes: Sequence[tuple], dtype: type = np.uint8
+    ) -> "RaggedArray":
+        """Preallocates a buffer for arrays of the given shapes.
+
+        Args:
+            shapes (Sequence[tuple]): Shape of every array. All shapes need\
+                the same number of dimensions.
+            dtype (type, optional): dtype of the arrays. Defaults to uint8.
+
+        Returns:
+            RaggedArray: Arrays with uninitialized content.
+        """
+        shapes = np.asarray(shapes, dtype=np.int64)
+        if len(shapes) == 0:
+            shapes = shapes.reshape(0, 0)
+        sizes = np.prod(shapes, axis=1)
+        offsets = np.cumsum(sizes) - sizes
+        buffer = np.empty(int(sizes.sum()), dtype=dtype)
+        return cls(buffer, offsets, shapes)
+
+    def __len__(self) -> int:
+        """Return the number of arrays."""
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Iterate over the arrays in order."""
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        """__repr__() defines the string representation of the given object.
+
+        use case:
+            images = RaggedArray.from_shapes([(2, 3, 3)])
+            print(images)
+        """
+        return (
+            f"{self.__class__.__name__}(arrays={len(self)}, "
+            f"dtype={self.buffer.dtype}, nbytes={self.nbytes})"
+        )
+
+    def __getitem__(
+        self, index: int | slice | Sequence[int]
+    ) -> "np.ndarray | RaggedArray":
+        """Get an array as a view on the buffer, or several arrays as a\
+            RaggedArray on the same buffer.
+
+        Args:
+            index (int | slice | Sequence[int]): Index, slice or indices.
+
+        Returns:
+            np.ndarray | RaggedArray: The array, or the selected arrays.
+        """
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if index < 0 or index >= len(self):
+                raise IndexError("ragged index out of range")
+            shape = tuple(self.shapes[index])
+            start = self.offsets[index]
+            size = int(np.prod(shape, dtype=np.int64))
+            return self.buffer[start : start + size].reshape(shape)
+        return RaggedArray(
+            self.buffer, self.offsets[index], self.shapes[index]
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the arrays in this sequence.
+
+        Returns:
+            int: Bytes of the selected arrays, not of the whole buffer.
+        """
+        sizes = np.prod(self.shapes, axis=1)
+        return int(np.sum(sizes)) * self.buffer.itemsize
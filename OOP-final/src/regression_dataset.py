@@ -1,6 +1,8 @@
 import os
 import sys
 
+import numpy as np
+
 from abc_dataset import Dataset
 
 sys.path.append(os.getcwd() + "/src/")
@@ -20,8 +22,34 @@ class RegressionDataset(Dataset):
             names of data points and corresponding labels.
             (required if labels=True). Defaults to None.
         lazy (bool, optional): Lazy loading of data. Defaults to False.
+        num_workers (int, optional): Number of workers that decode files\
+            during eager loading. Defaults to 1.
+        executor (str, optional): "thread" or "process" worker pool.\
+            Defaults to "thread".
+        cache_dir (str, optional): Folder for the persistent cache of\
+            decoded datapoints. Defaults to None (no cache).
+        cache_max_bytes (int, optional): Size cap of the cache in bytes.\
+            Defaults to None (no cap).
+        memory_cache_bytes (int, optional): Memory budget in bytes of the\
+            in-memory cache of a lazy dataset. Defaults to None (no cache).
+        zero_copy (bool, optional): Return read-only views instead of deep\
+            copies from __getitem__. Defaults to False.
+        sample_rate (int | str, optional): Sampling rate audio is loaded\
+            at, "native" keeps the rate of the file. Defaults to 22050.
+        csv_chunksize (int, optional): Number of csv rows parsed at a time.\
+            The labels are parsed as float64. Defaults to 100000.
+        contiguous (bool, optional): Store eager images in one (N, H, W, C)\
+            array, or a RaggedArray if their shapes differ, instead of a\
+            list. Defaults to False.
+        max_memory_bytes (int, optional): Memory budget of an eager\
+            dataset, estimated from the file headers. Samples that do not\
+            fit are decoded on access. Defaults to None (no budget).
+        max_concurrency (int, optional): Number of datapoints aget,\
+            aget_batch and async for read at the same time. Defaults to 8.
     """
 
+    _csv_label_dtype = np.float64
+
     def __init__(
         self,
         data_path: str,
@@ -29,6 +57,17 @@ class RegressionDataset(Dataset):
         labels: bool,
         csv_path: str = None,
         lazy: bool = False,
+        num_workers: int = 1,
+        executor: str = "thread",
+        cache_dir: str = None,
+        cache_max_bytes: int = None,
+        memory_cache_bytes: int = None,
+        zero_copy: bool = False,
+        sample_rate: int | str = 22050,
+        csv_chunksize: int = 100000,
+        contiguous: bool = False,
+        max_memory_bytes: int = None,
+        max_concurrency: int = 8,
     ) -> None:
         super().__init__(
             data_path=data_path,
@@ -36,6 +75,17 @@ class RegressionDataset(Dataset):
             labels=labels,
             csv_path=csv_path,
             lazy=lazy,
+            num_workers=num_workers,
+            executor=executor,
+            cache_dir=cache_dir,
+            cache_max_bytes=cache_max_bytes,
+            memory_cache_bytes=memory_cache_bytes,
+            zero_copy=zero_copy,
+            sample_rate=sample_rate,
+            csv_chunksize=csv_chunksize,
+            contiguous=contiguous,
+            max_memory_bytes=max_memory_bytes,
+            max_concurrency=max_concurrency,
         )
 
         if self._labels_bool is True and csv_path is None:
@@ -44,11 +94,8 @@ class RegressionDataset(Dataset):
             Give label_path."
             )
 
-        self.data = (
-            super()._create_data_from_folder(data_path)
-            if csv_path is None
-            else super()._create_data_from_csv()
-        )
-        self.labels = (
-            None if csv_path is None else super()._create_labels_from_csv()
-        )
+        if csv_path is None:
+            self.data = super()._create_data_from_folder(data_path)
+            self.labels = None
+        else:
+            self.data, self.labels = super()._create_data_from_csv()
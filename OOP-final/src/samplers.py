@@ -0,0 +1,505 @@
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Sequence
+
+import numpy as np
+
+from abc_dataset import Dataset
+
+sys.path.append(os.getcwd() + "/src/")
+
+
+class Sampler(ABC):
+    """An ABC for samplers, which decide the order in which a BatchLoader\
+        visits the samples of a dataset.
+
+    The indices of a whole epoch are computed in one vectorised call and\
+    only depend on the seed and the epoch, so every rank computes the same\
+    epoch and a restarted job gets the same epoch again.
+
+    Attributes:
+        _seed (int): Seed of the sampler.
+        _epoch (int): Epoch the next iteration uses.
+    """
+
+    def __init__(self, seed: int = None) -> None:
+        """Initialize the sampler.
+
+        Args:
+            seed (int, optional): Seed of the sampler. Defaults to None (a\
+                random seed).
+        """
+        self._seed = seed if seed is not None else np.random.randint(2**31)
+        self._epoch = 0
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of indices of an epoch."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def indices(self, epoch: int) -> np.ndarray:
+        """Computes the indices of an epoch.
+
+        Args:
+            epoch (int): The epoch.
+
+        Returns:
+            np.ndarray: Indices into the dataset.
+        """
+        raise NotImplementedError
+
+    def __iter__(self) -> Iterator[int]:
+        """Yields the indices of one epoch and moves on to the next epoch."""
+        indices = self.indices(self._epoch)
+        self._epoch += 1
+        yield from indices.tolist()
+
+    def set_epoch(self, epoch: int) -> None:
+        """Sets the epoch the next iteration uses.
+
+        Args:
+            epoch (int): The epoch.
+        """
+        self._epoch = epoch
+
+    def state_dict(self) -> dict:
+        """Returns the seed and the epoch, which fix every following epoch.
+
+        Returns:
+            dict: Seed and epoch of the sampler.
+        """
+        return {"seed": int(self._seed), "epoch": self._epoch}
+
+    def load_state_dict(self, state: dict) -> None:
+        """Continues from a state returned by state_dict.
+
+        Args:
+            state (dict): A state returned by state_dict.
+        """
+        self._seed = state["seed"]
+        self._epoch = state["epoch"]
+
+    def _rng(self, epoch: int) -> np.random.Generator:
+        """Returns the random generator of an epoch.
+
+        Args:
+            epoch (int): The epoch.
+
+        Returns:
+            np.random.Generator: A generator seeded with (seed, epoch).
+        """
+        return np.random.default_rng([self._seed, epoch])
+
+
+class RandomSampler(Sampler):
+    """Visits the samples in a random order, a new order every epoch.
+
+    Args:
+        num_items (int): Number of samples in the dataset.
+        replacement (bool, optional): Draw with replacement. Defaults to\
+            False.
+        num_samples (int, optional): Number of indices per epoch, needs\
+            replacement if it is bigger than num_items. Defaults to None\
+            (num_items).
+        seed (int, optional): Seed of the sampler. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        num_items: int,
+        replacement: bool = False,
+        num_samples: int = None,
+        seed: int = None,
+    ) -> None:
+        super().__init__(seed)
+        num_samples = num_items if num_samples is None else num_samples
+        if num_samples > num_items and replacement is False:
+            raise TypeError(
+                "num_samples bigger than the dataset needs replacement."
+            )
+        self._num_items = num_items
+        self._replacement = replacement
+        self._num_samples = num_samples
+
+    def __len__(self) -> int:
+        """Return the number of indices of an epoch."""
+        return self._num_samples
+
+    def indices(self, epoch: int) -> np.ndarray:
+        """Draws the indices of an epoch in one call.
+
+        Args:
+            epoch (int): The epoch.
+
+        Returns:
+            np.ndarray: Indices into the dataset.
+        """
+        rng = self._rng(epoch)
+        if self._replacement:
+            return rng.integers(0, self._num_items, self._num_samples)
+        return rng.permutation(self._num_items)[: self._num_samples]
+
+
+class WeightedRandomSampler(Sampler):
+    """Draws samples with replacement, every sample with a probability\
+        proportional to its weight, so rare samples can be seen more often\
+        without duplicating them in memory.
+
+    Args:
+        weights (Sequence[float]): Weight of every sample.
+        num_samples (int, optional): Number of indices per epoch. Defaults\
+            to None (the number of weights).
+        seed (int, optional): Seed of the sampler. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        weights: Sequence[float],
+        num_samples: int = None,
+        seed: int = None,
+    ) -> None:
+        super().__init__(seed)
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) == 0 or np.any(weights < 0) or weights.sum() <= 0:
+            raise TypeError("weights have to be positive and not all zero.")
+        self._probabilities = weights / weights.sum()
+        self._num_samples = (
+            len(weights) if num_samples is None else num_samples
+        )
+
+    def __len__(self) -> int:
+        """Return the number of indices of an epoch."""
+        return self._num_samples
+
+    def indices(self, epoch: int) -> np.ndarray:
+        """Draws the indices of an epoch in one call.
+
+        Args:
+            epoch (int): The epoch.
+
+        Returns:
+            np.ndarray: Indices into the dataset.
+        """
+        return self._rng(epoch).choice(
+            len(self._probabilities),
+            size=self._num_samples,
+            replace=True,
+            p=self._probabilities,
+        )
+
+
+class ClassBalancedSampler(WeightedRandomSampler):
+    """Draws every class equally often, whatever the class sizes are. The\
+        weights are computed from the label array of the dataset, no\
+        sample is duplicated.
+
+    use case:
+        sampler = ClassBalancedSampler(dataset.labels, seed=0)
+        loader = BatchLoader(dataset, sampler=sampler)
+
+    Args:
+        labels (Sequence): Label of every sample, e.g. dataset.labels.
+        num_samples (int, optional): Number of indices per epoch. Defaults\
+            to None (the number of labels).
+        seed (int, optional): Seed of the sampler. Defaults to None.
+    """
+
+    def __init__(
+        self, labels: Sequence, num_samples: int = None, seed: int = None
+    ) -> None:
+        _, codes, counts = np.unique(
+            np.asarray(labels), return_inverse=True, return_counts=True
+        )
+        super().__init__(1.0 / counts[codes], num_samples, seed)
+
+
+class InfiniteSampler(Sampler):
+    """Chains the epochs of another sampler into an endless stream, for\
+        training loops that count steps instead of epochs. A BatchLoader\
+        with an InfiniteSampler has no length and never stops.
+
+    Args:
+        sampler (Sampler): The sampler whose epochs are chained.
+    """
+
+    def __init__(self, sampler: Sampler) -> None:
+        super().__init__(sampler._seed)
+        self._sampler = sampler
+        self._cache = {}
+
+    def __len__(self) -> int:
+        """An endless stream has no length."""
+        raise TypeError("InfiniteSampler has no length.")
+
+    def indices(self, epoch: int) -> np.ndarray:
+        """Computes an epoch of the chained sampler.
+
+        Args:
+            epoch (int): The epoch.
+
+        Returns:
+            np.ndarray: Indices into the dataset.
+        """
+        if epoch not in self._cache:
+            # the stream moves forward, keep only the newest epochs
+            if len(self._cache) >= 2:
+                del self._cache[min(self._cache)]
+            self._cache[epoch] = self._sampler.indices(epoch)
+        return self._cache[epoch]
+
+    def __iter__(self) -> Iterator[int]:
+        """Yields indices forever."""
+        while True:
+            yield from super().__iter__()
+
+    def positions(self, start: int, stop: int) -> np.ndarray:
+        """Returns the indices at positions start to stop of the stream.
+
+        Args:
+            start (int): First position.
+            stop (int): Position after the last one.
+
+        Returns:
+            np.ndarray: Indices into the dataset.
+        """
+        epoch_length = len(self._sampler)
+        parts = []
+        while start < stop:
+            epoch, offset = divmod(start, epoch_length)
+            end = min(stop - start, epoch_length - offset)
+            parts.append(self.indices(epoch)[offset : offset + end])
+            start += end
+        return np.concatenate(parts) if parts else np.zeros(0, np.int64)
+
+    def load_state_dict(self, state: dict) -> None:
+        """Continues from a state returned by state_dict.
+
+        Args:
+            state (dict): A state returned by state_dict.
+        """
+        super().load_state_dict(state)
+        self._sampler.load_state_dict(state)
+        self._cache = {}
+
+
+class BucketBatchSampler:
+    """Groups samples of similar length into batches, so a padded batch\
+        wastes little memory on padding.
+
+    The samples are sorted by length and cut into num_buckets buckets of\
+    about the same size. Every epoch the samples of each bucket are\
+    shuffled and packed into batches, and the batches of all buckets are\
+    shuffled together, so the order still changes between epochs. A batch\
+    is closed when it would exceed max_samples_per_batch samples or when\
+    its padded size (number of samples times the longest length) would\
+    exceed max_tokens.
+
+    use case:
+        sampler = BucketBatchSampler.from_dataset(dataset, max_tokens=2**22)
+        loader = BatchLoader(dataset, batch_sampler=sampler,
+                             collator=Collator(mode="pad"))
+
+    Attributes:
+        lengths (np.ndarray): Length of every sample.
+        _max_samples_per_batch (int): Most samples in a batch.
+        _max_tokens (int): Most padded length units in a batch.
+        _num_buckets (int): Number of length buckets.
+        _shuffle (bool): Whether to shuffle within and between buckets.
+        _seed (int): Seed of the shuffle.
+        _drop_last (bool): Whether to drop the last, smaller batch of every\
+            bucket.
+        _epoch (int): Epoch the next iteration uses.
+    """
+
+    def __init__(
+        self,
+        lengths: np.ndarray,
+        max_samples_per_batch: int = None,
+        max_tokens: int = None,
+        num_buckets: int = 10,
+        shuffle: bool = True,
+        seed: int = None,
+        drop_last: bool = False,
+    ) -> None:
+        """Initialize the sampler.
+
+        Args:
+            lengths (np.ndarray): Length of every sample, e.g. the number\
+                of audio frames.
+            max_samples_per_batch (int, optional): Most samples in a batch.\
+                Defaults to None (no limit).
+            max_tokens (int, optional): Most padded length units in a batch.\
+                Defaults to None (no limit).
+            num_buckets (int, optional): Number of length buckets.\
+                Defaults to 10.
+            shuffle (bool, optional): Whether to shuffle within and between\
+                buckets. Defaults to True.
+            seed (int, optional): Seed of the shuffle. Every iteration uses\
+                the next epoch of this seed. Defaults to None (a random\
+                seed).
+            drop_last (bool, optional): Whether to drop the last, smaller\
+                batch of every bucket. Defaults to False.
+
+        Raises:
+            TypeError: If neither max_samples_per_batch nor max_tokens is\
+                given, or one of them is smaller than 1.
+        """
+        if max_samples_per_batch is None and max_tokens is None:
+            raise TypeError("Give max_samples_per_batch, max_tokens or both.")
+        for limit in (max_samples_per_batch, max_tokens):
+            if limit is not None and limit < 1:
+                raise TypeError("Batch limits have to be at least 1.")
+        if num_buckets < 1:
+            raise TypeError("num_buckets has to be at least 1.")
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self._max_samples_per_batch = max_samples_per_batch
+        self._max_tokens = max_tokens
+        self._num_buckets = num_buckets
+        self._shuffle = shuffle
+        # a fixed seed keeps the epochs reproducible after a restart
+        self._seed = seed if seed is not None else np.random.randint(2**31)
+        self._drop_last = drop_last
+        self._epoch = 0
+        self._plan = None
+
+    @classmethod
+    def from_dataset(cls, dataset: Dataset, **kwargs) -> "BucketBatchSampler":
+        """Creates a sampler with the lengths read from the file headers of\
+            a dataset (see Dataset.metadata), so nothing is decoded. Audio\
+            lengths are frames at the sampling rate the dataset loads at,\
+            image lengths are numbers of pixels.
+
+        Args:
+            dataset (Dataset): The dataset.
+            **kwargs: Arguments of the sampler.
+
+        Returns:
+            BucketBatchSampler: The sampler.
+        """
+        headers = dataset.metadata()
+        if dataset.data_type == "image":
+            lengths = headers["height"].astype(np.int64) * headers["width"]
+        else:
+            if dataset._sample_rate == "native":
+                sampling_rates = headers["sampling_rate"]
+            else:
+                sampling_rates = dataset._sample_rate
+            lengths = np.ceil(headers["duration"] * sampling_rates)
+        return cls(lengths, **kwargs)
+
+    def __len__(self) -> int:
+        """Return the number of batches of the next epoch."""
+        return len(self._batches())
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Yields the batches of one epoch.
+
+        Returns:
+            Iterator[np.ndarray]: Indices of every batch.
+        """
+        batches = self._batches()
+        self._epoch += 1
+        yield from batches
+
+    def set_epoch(self, epoch: int) -> None:
+        """Sets the epoch the next iteration uses, BatchLoader calls this\
+            so that the sampler follows the epochs of the loader.
+
+        Args:
+            epoch (int): The epoch.
+        """
+        self._epoch = epoch
+
+    def state_dict(self) -> dict:
+        """Returns the seed and the epoch, which fix the batches of every\
+            following epoch.
+
+        Returns:
+            dict: Seed and epoch of the sampler.
+        """
+        return {"seed": int(self._seed), "epoch": self._epoch}
+
+    def load_state_dict(self, state: dict) -> None:
+        """Continues from a state returned by state_dict.
+
+        Args:
+            state (dict): A state returned by state_dict.
+        """
+        self._seed = state["seed"]
+        self._epoch = state["epoch"]
+        self._plan = None
+
+    def padding_overhead(self) -> float:
+        """Share of the padded batches of the next epoch that is padding.
+
+        Returns:
+            float: Padding divided by the padded size of all batches.
+        """
+        padded = 0
+        used = 0
+        for batch in self._batches():
+            lengths = self.lengths[batch]
+            padded += len(batch) * int(lengths.max(initial=0))
+            used += int(lengths.sum())
+        return 1 - used / padded if padded > 0 else 0.0
+
+    def _batches(self) -> List[np.ndarray]:
+        """Plans the batches of the current epoch once.
+
+        Returns:
+            List[np.ndarray]: Indices of every batch.
+        """
+        if self._plan is not None and self._plan[0] == self._epoch:
+            return self._plan[1]
+        rng = np.random.default_rng([self._seed, self._epoch])
+
+        order = np.argsort(self.lengths, kind="stable")
+        batches = []
+        for bucket in np.array_split(order, self._num_buckets):
+            if self._shuffle is True:
+                bucket = rng.permutation(bucket)
+            batches.extend(self._pack(bucket))
+        if self._shuffle is True:
+            batches = [batches[i] for i in rng.permutation(len(batches))]
+        self._plan = (self._epoch, batches)
+        return batches
+
+    def _pack(self, bucket: np.ndarray) -> List[np.ndarray]:
+        """Packs the samples of a bucket into batches within the limits.
+
+        Args:
+            bucket (np.ndarray): Indices of the bucket, in packing order.
+
+        Returns:
+            List[np.ndarray]: Indices of every batch.
+        """
+        batches = []
+        start = 0
+        longest = 0
+        for position, index in enumerate(bucket):
+            length = max(longest, int(self.lengths[index]))
+            count = position - start + 1
+            too_many = (
+                self._max_samples_per_batch is not None
+                and count > self._max_samples_per_batch
+            )
+            too_long = (
+                self._max_tokens is not None
+                and count * length > self._max_tokens
+            )
+            if count > 1 and (too_many or too_long):
+                batches.append(bucket[start:position])
+                start = position
+                length = int(self.lengths[index])
+            longest = length
+        if start < len(bucket):
+            last = bucket[start:]
+            full = (
+                self._max_samples_per_batch is None
+                or len(last) == self._max_samples_per_batch
+            )
+            if not self._drop_last or full:
+                batches.append(last)
+        return batches
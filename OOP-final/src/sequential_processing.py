@@ -1,6 +1,8 @@
 import os
 import sys
-from copy import deepcopy
+from typing import Sequence
+
+import numpy as np
 
 from abc_dataset import Dataset
 from abc_preprocessing import PreProcessingTechnique
@@ -43,18 +45,16 @@ class SequentialPreprocessing(PreProcessingTechnique):
         Returns:
             Dataset: Preprocessed dataset.
         """
-        preprocessed_dataset = deepcopy(dataset)
-        if preprocessed_dataset.lazy is True:
-            preprocessed_dataset.data = preprocessed_dataset._if_lazy(
-                preprocessed_dataset.data
-            )
-            preprocessed_dataset.lazy = False
-
         for processing_step in self.preprocessing_steps:
-
             self._data_type_checker(
                 dataset=dataset, processing_step=processing_step
             )
+
+        # leading steps may be pushed into decoding of a lazy dataset
+        preprocessed_dataset, remaining_steps = self._load_for_processing(
+            dataset, self.preprocessing_steps
+        )
+        for processing_step in remaining_steps:
             preprocessed_dataset = self._transformation(
                 data=preprocessed_dataset, processingtechnique=processing_step
             )
@@ -81,6 +81,36 @@ class SequentialPreprocessing(PreProcessingTechnique):
         """
         return processingtechnique(data)
 
+    def apply_batch(
+        self, batch: np.ndarray | Sequence[np.ndarray]
+    ) -> np.ndarray | list:
+        """Applies the steps to a batch one after the other, each with its\
+            own batch API (see PreProcessingTechnique.apply_batch).
+
+        Args:
+            batch (np.ndarray | Sequence[np.ndarray]): Datapoints stacked\
+                along the first axis, or a sequence of datapoints.
+
+        Returns:
+            np.ndarray | list: The processed datapoints.
+        """
+        for processing_step in self.preprocessing_steps:
+            batch = processing_step.apply_batch(batch)
+        return batch
+
+    def _transform_item(self, data_point: np.ndarray) -> np.ndarray:
+        """Applies the steps to a single datapoint one after the other.
+
+        Args:
+            data_point (np.ndarray): A datapoint.
+
+        Returns:
+            np.ndarray: The processed datapoint.
+        """
+        for processing_step in self.preprocessing_steps:
+            data_point = processing_step._transform_item(data_point)
+        return data_point
+
     def _data_type_checker(
         self,
         dataset: ClassificationDataset | RegressionDataset,
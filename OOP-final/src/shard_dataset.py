@@ -0,0 +1,316 @@
+import json
+import os
+import sys
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from abc_dataset import Dataset
+
+sys.path.append(os.getcwd() + "/src/")
+
+MANIFEST_NAME = "manifest.json"
+# every array starts on a 64 byte boundary, so views on the buffer are
+# aligned for any dtype
+ALIGNMENT = 64
+
+
+def write_shards(
+    dataset: Dataset, output_dir: str, shard_bytes: int = 256 * 2**20
+) -> List[str]:
+    """Packs a ClassificationDataset or RegressionDataset into a few large\
+        shard files that can be opened again with ShardDataset.
+
+    Every shard consists of a .bin file with one contiguous data buffer and\
+    a .npz file with the offsets, shapes, dtypes and sampling rates of the\
+    datapoints and their labels. A manifest.json lists the shards.
+
+    use case:
+        write_shards(dataset, "chess_shards")
+        shards = ShardDataset("chess_shards")
+
+    Args:
+        dataset (Dataset): Dataset to pack. Lazy datasets are decoded one\
+            datapoint at a time.
+        output_dir (str): Folder for the shard files.
+        shard_bytes (int, optional): Size after which a new shard is\
+            started. Defaults to 256 MiB.
+
+    Returns:
+        List[str]: Names of the written shards.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    has_labels = dataset._labels_bool is True and dataset.labels is not None
+    shards = []
+    writer = None
+    for index in range(len(dataset)):
+        if writer is None:
+            writer = _ShardWriter(output_dir, f"shard_{len(shards):05d}")
+        data_point = dataset._if_lazy(dataset.data[index])
+        label = dataset.labels[index] if has_labels else None
+        writer.append(data_point, label)
+        if writer.nbytes >= shard_bytes:
+            shards.append(writer.close(has_labels))
+            writer = None
+    if writer is not None:
+        shards.append(writer.close(has_labels))
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as manifest:
+        json.dump(
+            {
+                "data_type": dataset.data_type,
+                "labels": has_labels,
+                "shards": shards,
+            },
+            manifest,
+        )
+    return [shard["name"] for shard in shards]
+
+
+class _ShardWriter:
+    """Writes the datapoints of a single shard.
+
+    Attributes:
+        nbytes (int): Bytes written to the data buffer so far.
+    """
+
+    def __init__(self, output_dir: str, name: str) -> None:
+        self._output_dir = output_dir
+        self._name = name
+        self._file = open(os.path.join(output_dir, name + ".bin"), "wb")
+        self._offsets = []
+        self._shapes = []
+        self._dtypes = []
+        self._sampling_rates = []
+        self._labels = []
+        self.nbytes = 0
+
+    def append(self, data_point: np.ndarray | tuple, label=None) -> None:
+        """Appends a datapoint to the data buffer.
+
+        Args:
+            data_point (np.ndarray | tuple): An image array or an (array,\
+                sampling rate) tuple.
+            label (optional): Label of the datapoint. Defaults to None.
+        """
+        if isinstance(data_point, tuple):
+            array, sampling_rate = data_point
+        else:
+            array, sampling_rate = data_point, -1
+        array = np.ascontiguousarray(array)
+
+        padding = -self.nbytes % ALIGNMENT
+        self._file.write(b"\0" * padding)
+        self.nbytes += padding
+
+        self._offsets.append(self.nbytes)
+        self._shapes.append(array.shape)
+        self._dtypes.append(array.dtype.str)
+        self._sampling_rates.append(sampling_rate)
+        self._labels.append(label)
+        self._file.write(array.tobytes())
+        self.nbytes += array.nbytes
+
+    def close(self, has_labels: bool) -> dict:
+        """Closes the data buffer and writes the index of the shard.
+
+        Args:
+            has_labels (bool): Whether the labels are written as well.
+
+        Returns:
+            dict: Name and number of datapoints of the shard.
+        """
+        self._file.close()
+        max_ndim = max(len(shape) for shape in self._shapes)
+        shapes = np.zeros((len(self._shapes), max_ndim), dtype=np.int64)
+        for row, shape in enumerate(self._shapes):
+            shapes[row, : len(shape)] = shape
+        index = {
+            "offsets": np.array(self._offsets, dtype=np.int64),
+            "shapes": shapes,
+            "ndims": np.array([len(s) for s in self._shapes], dtype=np.int8),
+            "dtypes": np.array(self._dtypes),
+            "sampling_rates": np.array(self._sampling_rates, dtype=np.int64),
+        }
+        if has_labels:
+            labels = np.array(self._labels)
+            # object arrays would need pickling, store mixed labels as text
+            if labels.dtype == object:
+                labels = labels.astype(str)
+            index["labels"] = labels
+        np.savez(os.path.join(self._output_dir, self._name + ".npz"), **index)
+        return {"name": self._name, "count": len(self._offsets)}
+
+
+class ShardArrays:
+    """A read-only sequence over the datapoints of a folder of shards.\
+        Every shard buffer is memory-mapped once, so reading a datapoint is\
+        a slice of the mapping and does not open any file. Slicing or\
+        fancy indexing returns a ShardArrays over the selected datapoints\
+        that shares the mapped buffers.
+
+    Attributes:
+        _path (str): Folder with the shards.
+        _shards (List[dict]): Names and sizes of the shards.
+        _starts (np.ndarray): Index of the first datapoint of each shard.
+        _indexes (List[dict]): Offsets, shapes, dtypes and sampling rates\
+            of each shard.
+        _buffers (List[np.memmap]): Memory-mapped data buffers.
+        _rows (np.ndarray): Indices of the selected datapoints in all\
+            shards, None if all datapoints are selected.
+    """
+
+    def __init__(self, path: str, shards: List[dict]) -> None:
+        self._path = path
+        self._shards = shards
+        counts = [shard["count"] for shard in shards]
+        self._starts = np.concatenate(([0], np.cumsum(counts)))
+        self._indexes = [
+            dict(np.load(os.path.join(path, shard["name"] + ".npz")))
+            for shard in shards
+        ]
+        self._rows = None
+        self._open_buffers()
+
+    def _open_buffers(self) -> None:
+        """Memory-maps the data buffer of every shard."""
+        self._buffers = []
+        for shard in self._shards:
+            buffer_path = os.path.join(self._path, shard["name"] + ".bin")
+            if os.path.getsize(buffer_path) == 0:
+                self._buffers.append(np.zeros(0, dtype=np.uint8))
+            else:
+                self._buffers.append(
+                    np.memmap(buffer_path, dtype=np.uint8, mode="r")
+                )
+
+    def __getstate__(self) -> dict:
+        """Copies and pickles map the shards again instead of copying the\
+            mapped buffers."""
+        state = self.__dict__.copy()
+        del state["_buffers"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Rebuild the sequence from a pickled state."""
+        self.__dict__.update(state)
+        self._open_buffers()
+
+    def __len__(self) -> int:
+        """Return the number of selected datapoints."""
+        if self._rows is not None:
+            return len(self._rows)
+        return int(self._starts[-1])
+
+    def __iter__(self) -> Iterator[np.ndarray | Tuple[np.ndarray, int]]:
+        """Iterate over the datapoints in order."""
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(
+        self, index: int | slice | Sequence[int]
+    ) -> "np.ndarray | Tuple[np.ndarray, int] | ShardArrays":
+        """Get a datapoint as a view on the memory-mapped buffer, or several\
+            datapoints as a ShardArrays on the same buffers.
+
+        Args:
+            index (int | slice | Sequence[int]): Index, slice or indices.
+
+        Returns:
+            np.ndarray | Tuple[np.ndarray, int] | ShardArrays: An image\
+            array or an (array, sampling rate) tuple, or the selected\
+            datapoints.
+        """
+        if not isinstance(index, (int, np.integer)):
+            return self._select(np.arange(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("shard index out of range")
+        if self._rows is not None:
+            index = int(self._rows[index])
+        shard = int(np.searchsorted(self._starts, index, side="right")) - 1
+        position = index - self._starts[shard]
+        shard_index = self._indexes[shard]
+
+        dtype = np.dtype(str(shard_index["dtypes"][position]))
+        shape = tuple(
+            shard_index["shapes"][position, : shard_index["ndims"][position]]
+        )
+        offset = shard_index["offsets"][position]
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        array = (
+            self._buffers[shard][offset : offset + nbytes]
+            .view(dtype)
+            .reshape(shape)
+        )
+
+        sampling_rate = shard_index["sampling_rates"][position]
+        if sampling_rate < 0:
+            return array
+        return (array, int(sampling_rate))
+
+    def _select(self, positions: np.ndarray) -> "ShardArrays":
+        """Returns a ShardArrays over some of the selected datapoints. It\
+            shares the indexes and the mapped buffers, nothing is copied.
+
+        Args:
+            positions (np.ndarray): Positions in this sequence.
+
+        Returns:
+            ShardArrays: The selected datapoints.
+        """
+        selection = object.__new__(ShardArrays)
+        selection.__dict__.update(self.__dict__)
+        selection._rows = (
+            positions if self._rows is None else self._rows[positions]
+        )
+        return selection
+
+    def labels(self) -> np.ndarray | None:
+        """Concatenates the labels of all shards.
+
+        Returns:
+            np.ndarray | None: Labels of the selected datapoints, None if\
+            the shards were written without labels.
+        """
+        if not self._indexes or "labels" not in self._indexes[0]:
+            return None
+        labels = np.concatenate([index["labels"] for index in self._indexes])
+        return labels if self._rows is None else labels[self._rows]
+
+
+class ShardDataset(Dataset):
+    """ShardDataset opens a folder written by write_shards. The data is\
+        served from memory-mapped shard buffers, so random access costs a\
+        slice instead of opening and decoding a file.
+
+    Args:
+        data_path (str): Folder with the shards.
+        labels (bool, optional): Whether to return labels. Defaults to True.
+        zero_copy (bool, optional): Return read-only views on the shards\
+            instead of copies from __getitem__. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        data_path: str,
+        labels: bool = True,
+        zero_copy: bool = False,
+    ) -> None:
+        with open(os.path.join(data_path, MANIFEST_NAME)) as manifest_file:
+            manifest = json.load(manifest_file)
+        if labels is True and manifest["labels"] is False:
+            raise NameError(
+                "Labels is set to True but the shards have no labels."
+            )
+
+        super().__init__(
+            data_path=data_path,
+            data_type=manifest["data_type"],
+            labels=labels,
+            lazy=False,
+            zero_copy=zero_copy,
+        )
+        self.data = ShardArrays(data_path, manifest["shards"])
+        self.labels = self.data.labels() if labels is True else None
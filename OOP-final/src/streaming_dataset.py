@@ -0,0 +1,227 @@
+import asyncio
+import os
+import random
+import sys
+from typing import AsyncIterator, Iterator, Sequence, Tuple
+
+import numpy as np
+
+from abc_dataset import Dataset
+from directory_scanner import iter_supported_files
+
+sys.path.append(os.getcwd() + "/src/")
+
+
+class StreamingDataset(Dataset):
+    """StreamingDataset walks the dataset while it is iterated and yields\
+        the datapoints one by one, without ever building the list of files.\
+        Its memory use does not depend on the size of the dataset, which\
+        makes it usable for folders with millions of files.
+
+    The dataset can only be iterated: it has no length and no random\
+    access. Shuffling is done with a bounded shuffle buffer that holds\
+    shuffle_buffer paths; a bigger buffer gives a better shuffle.
+
+    Args:
+        data_path (str): Root of the dataset.
+        data_type (str): Type of data, e.g., 'image' or 'audio'.
+        labels (bool): Whether to yield (data, label) pairs.
+        dataset_format (str, optional): "hierarchical" (one subfolder per\
+            class), "csv" (file names and labels in csv_path) or "folder"\
+            (all files in data_path, no labels). Defaults to "hierarchical".
+        csv_path (str, optional): Path to the csv file, required for the\
+            "csv" format. Defaults to None.
+        shuffle_buffer (int, optional): Size of the shuffle buffer, 0 or 1\
+            keeps the order of the walk. Defaults to 0.
+        seed (int, optional): Seed of the shuffle. Every iteration uses the\
+            next epoch of this seed. Defaults to None.
+        csv_chunksize (int, optional): Number of csv rows read at a time.\
+            Defaults to 10000.
+        cache_dir (str, optional): Folder for the persistent cache of\
+            decoded datapoints. Defaults to None (no cache).
+        cache_max_bytes (int, optional): Size cap of the cache in bytes.\
+            Defaults to None (no cap).
+        sample_rate (int | str, optional): Sampling rate audio is loaded\
+            at, "native" keeps the rate of the file. Defaults to 22050.
+    """
+
+    def __init__(
+        self,
+        data_path: str,
+        data_type: str,
+        labels: bool,
+        dataset_format: str = "hierarchical",
+        csv_path: str = None,
+        shuffle_buffer: int = 0,
+        seed: int = None,
+        csv_chunksize: int = 10000,
+        cache_dir: str = None,
+        cache_max_bytes: int = None,
+        sample_rate: int | str = 22050,
+    ) -> None:
+        if dataset_format not in ["csv", "hierarchical", "folder"]:
+            raise NameError(
+                "data format has to be one of 'csv', 'hierarchical' or "
+                "'folder'"
+            )
+        if dataset_format == "csv" and csv_path is None:
+            raise NameError("dataset_format 'csv' needs a csv_path.")
+        if dataset_format == "folder" and labels is True:
+            raise NameError(
+                "Labels is set to True but the 'folder' format has no labels."
+            )
+        if shuffle_buffer < 0:
+            raise TypeError("shuffle_buffer has to be positive.")
+
+        super().__init__(
+            data_path=data_path,
+            data_type=data_type,
+            labels=labels,
+            csv_path=csv_path,
+            lazy=True,
+            cache_dir=cache_dir,
+            cache_max_bytes=cache_max_bytes,
+            sample_rate=sample_rate,
+            csv_chunksize=csv_chunksize,
+        )
+        self._dataset_format = dataset_format
+        self._shuffle_buffer = shuffle_buffer
+        self._seed = seed
+        self._epoch = 0
+
+    def __repr__(self) -> str:
+        """__repr__() defines the string representation of the given object.
+
+        use case:
+            dataset = StreamingDataset()
+            print(dataset)
+        """
+        return (
+            f"{self.__class__.__name__}:(\n"
+            f"Data type: {self._data_type},\n"
+            f"Dataset format: {self._dataset_format},\n"
+            f"Has labels: {self._labels_bool},\n"
+            f"Shuffle buffer: {self._shuffle_buffer}\n"
+            ")"
+        )
+
+    def __len__(self) -> int:
+        """A streaming dataset does not know its length without walking\
+            the whole dataset."""
+        raise TypeError(
+            "StreamingDataset has no length, iterate over it instead."
+        )
+
+    def __getitem__(self, index: int) -> tuple:
+        """A streaming dataset has no random access."""
+        raise TypeError(
+            "StreamingDataset has no random access, iterate over it instead."
+        )
+
+    def get_batch(self, indices: Sequence[int]) -> list:
+        """A streaming dataset has no random access."""
+        raise TypeError(
+            "StreamingDataset has no random access, iterate over it instead."
+        )
+
+    def __iter__(self) -> Iterator[np.array | Tuple[np.array, str]]:
+        """Walks the dataset and yields the decoded datapoints.
+
+        Returns:
+            Iterator[np.array | Tuple[np.array, str]]: datapoints, or\
+            (datapoint, label) pairs if labels is set to True.
+        """
+        seed = None if self._seed is None else (self._seed, self._epoch)
+        self._epoch += 1
+        for filename, label in self._shuffled(self._walk(), seed):
+            data_point = self._read_data_point(filename)
+            if self._labels_bool is True:
+                yield (data_point, label)
+            else:
+                yield data_point
+
+    async def __aiter__(self) -> AsyncIterator:
+        """Walks the dataset with async for. The walk is a single generator,\
+            so the datapoints are read one after the other on a thread of\
+            the async API instead of blocking the event loop.
+
+        Returns:
+            AsyncIterator: The same datapoints as __iter__.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_async_executor()
+        iterator = iter(self)
+        end = object()
+        while True:
+            item = await loop.run_in_executor(executor, next, iterator, end)
+            if item is end:
+                return
+            yield item
+
+    def _shuffled(self, entries: Iterator[tuple], seed: tuple) -> Iterator:
+        """Shuffles a stream with a bounded buffer: every new entry takes\
+            the place of a random entry of the buffer, which is yielded.
+
+        Args:
+            entries (Iterator[tuple]): (path, label) pairs in walk order.
+            seed (tuple): Seed and epoch of the shuffle, or None.
+
+        Returns:
+            Iterator: The same entries in shuffled order.
+        """
+        if self._shuffle_buffer <= 1:
+            yield from entries
+            return
+
+        rng = random.Random(repr(seed)) if seed is not None else random
+        buffer = []
+        for entry in entries:
+            if len(buffer) < self._shuffle_buffer:
+                buffer.append(entry)
+                continue
+            position = rng.randrange(self._shuffle_buffer)
+            yield buffer[position]
+            buffer[position] = entry
+        rng.shuffle(buffer)
+        yield from buffer
+
+    def _walk(self) -> Iterator[Tuple[str, str]]:
+        """Walks the dataset according to its format.
+
+        Returns:
+            Iterator[Tuple[str, str]]: (path, label) pairs, the label is\
+            None if the format has no labels.
+        """
+        if self._dataset_format == "csv":
+            yield from self._walk_csv()
+        elif self._dataset_format == "hierarchical":
+            with os.scandir(self._root) as class_entries:
+                for class_entry in class_entries:
+                    if class_entry.is_dir():
+                        for path in self._walk_folder(class_entry.path):
+                            yield (path, class_entry.name)
+        else:
+            for path in self._walk_folder(self._root):
+                yield (path, None)
+
+    def _walk_folder(self, folder: str) -> Iterator[str]:
+        """Yields the supported files of a folder.
+
+        Args:
+            folder (str): Path to the folder.
+
+        Returns:
+            Iterator[str]: Paths to the files.
+        """
+        for entry in iter_supported_files(folder):
+            yield entry.path
+
+    def _walk_csv(self) -> Iterator[Tuple[str, str]]:
+        """Reads the csv file in chunks and yields its rows.
+
+        Returns:
+            Iterator[Tuple[str, str]]: (path, label) pairs.
+        """
+        for names, labels in self._iter_csv_chunks():
+            for name, label in zip(names.tolist(), labels.tolist()):
+                yield (os.path.join(self._root, name), label)
@@ -1,13 +1,44 @@
+import asyncio
 import os
+import pickle
+import shutil
 import sys
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
 
 import numpy as np
+import soundfile as sf
+from PIL import Image
 
 sys.path.append(os.getcwd() + "/src/")
 
+from abc_dataset import Dataset, Subset
+from benchmarking import decode_benchmark, getitem_latency, worker_scaling
+from caching import DiskCache, MemoryCache
 from classification_dataset import ClassificationDataset
+from collator import Collator
+from directory_scanner import DirectoryScanner
+from label_encoder import LabelEncoder
+from ragged_array import RaggedArray
 from regression_dataset import RegressionDataset
+from samplers import (
+    BucketBatchSampler,
+    ClassBalancedSampler,
+    InfiniteSampler,
+    RandomSampler,
+    WeightedRandomSampler,
+)
+from shard_dataset import ShardDataset, write_shards
+from streaming_dataset import StreamingDataset
+
+from src.audio_random_cropping import RandomCropper
+from src.audio_resampling import Resampler
+from src.batch_loader import BatchLoader
+from src.image_center_crop import CenterCrop
+from src.image_random_patching import RandomPatching
+from src.sequential_processing import SequentialPreprocessing
 
 
 class TestClassificationImage(unittest.TestCase):
@@ -368,5 +399,1387 @@ class TestTrainTest(unittest.TestCase):
     # eager, no shuffle, labels
 
 
+class TestParallelLoading(unittest.TestCase):
+    def test_thread_pool_keeps_order(self):
+        sequential = ClassificationDataset(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+            dataset_format="hierarchical",
+        )
+        parallel = ClassificationDataset(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+            dataset_format="hierarchical",
+            num_workers=4,
+        )
+        self.assertEqual(len(sequential), len(parallel))
+        self.assertEqual(sequential.labels, parallel.labels)
+        for index in range(len(sequential)):
+            self.assertTrue(
+                np.array_equal(sequential.data[index], parallel.data[index])
+            )
+
+    def test_process_pool_keeps_order(self):
+        sequential = RegressionDataset(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=True,
+            csv_path="regression_data/poster.csv",
+        )
+        parallel = RegressionDataset(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=True,
+            csv_path="regression_data/poster.csv",
+            num_workers=2,
+            executor="process",
+        )
+        np.testing.assert_array_equal(sequential.labels, parallel.labels)
+        for index in range(len(sequential)):
+            self.assertTrue(
+                np.array_equal(sequential.data[index], parallel.data[index])
+            )
+
+    def test_process_workers_get_a_small_decoder(self):
+        dataset = RegressionDataset(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=True,
+            csv_path="regression_data/poster.csv",
+            lazy=True,
+        )
+        decoder = dataset._decoder()
+        self.assertIsNone(decoder.data)
+        self.assertIsNone(decoder._filepaths)
+        self.assertIsNotNone(dataset._filepaths)
+        decoder_bytes = len(pickle.dumps(decoder))
+        dataset.data = dataset.data * 100
+        self.assertEqual(decoder_bytes, len(pickle.dumps(dataset._decoder())))
+        np.testing.assert_array_equal(
+            dataset[0][0], decoder._read_data_point(dataset.data[0])
+        )
+
+    def test_worker_scaling_report(self):
+        reports = worker_scaling(
+            RegressionDataset,
+            [1, 2],
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=False,
+        )
+        self.assertEqual([1, 2], [r["num_workers"] for r in reports])
+        self.assertEqual(100, reports[1]["files"])
+        self.assertEqual(1.0, reports[0]["speedup"])
+
+    def test_wrong_executor(self):
+        with self.assertRaises(NameError):
+            RegressionDataset(
+                data_path="regression_data/poster_data",
+                data_type="image",
+                labels=False,
+                executor="fiber",
+            )
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.source_dir = tempfile.mkdtemp()
+        self.image_path = os.path.join(self.source_dir, "117690.jpg")
+        shutil.copy("regression_data/poster_data/117690.jpg", self.image_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        shutil.rmtree(self.source_dir)
+
+    def test_cached_dataset_is_memory_mapped(self):
+        kwargs = dict(
+            data_path="song_data/songs",
+            data_type="audio",
+            labels=True,
+            csv_path="song_data/songs.csv",
+            lazy=True,
+            cache_dir=self.cache_dir,
+        )
+        first = RegressionDataset(**kwargs)[0]
+        dataset = RegressionDataset(**kwargs)
+        cached = dataset._read_data_point(dataset.data[0])
+        self.assertIsInstance(cached[0], np.memmap)
+        self.assertEqual(first[0][1], cached[1])
+        self.assertTrue(np.array_equal(first[0][0], cached[0]))
+
+    def test_stale_entry_is_replaced(self):
+        cache = DiskCache(self.cache_dir)
+        cache.store(self.image_path, ("image",), np.zeros(4, np.uint8))
+        self.assertIsNotNone(cache.load(self.image_path, ("image",)))
+
+        stat = os.stat(self.image_path)
+        os.utime(self.image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertIsNone(cache.load(self.image_path, ("image",)))
+        cache.store(self.image_path, ("image",), np.ones(8, np.uint8))
+        self.assertEqual(1, len(cache._entries()))
+
+    def test_lru_eviction(self):
+        cache = DiskCache(self.cache_dir, max_bytes=1500)
+        cache.store(self.image_path, ("a",), np.zeros(1000, np.uint8))
+        cache.store(self.image_path, ("b",), np.zeros(10, np.uint8))
+        cache.load(self.image_path, ("a",))
+        cache.store(self.image_path, ("c",), np.zeros(100, np.uint8))
+        self.assertLessEqual(cache.current_bytes, 1500)
+        cache.store(self.image_path, ("d",), np.zeros(1000, np.uint8))
+        self.assertIsNone(cache.load(self.image_path, ("a",)))
+        self.assertIsNotNone(cache.load(self.image_path, ("d",)))
+
+
+    def test_eviction_leaves_headroom(self):
+        cache = DiskCache(self.cache_dir, max_bytes=20_000)
+        # 18 entries of 1128 bytes go over the cap with the last one
+        for index in range(18):
+            cache.store(self.image_path, (index,), np.zeros(1000, np.uint8))
+        self.assertLessEqual(cache.current_bytes, 18_000)
+        scans = []
+        entries = cache._entries
+        cache._entries = lambda: scans.append(1) or entries()
+        cache.store(self.image_path, ("next",), np.zeros(1000, np.uint8))
+        self.assertEqual([], scans)
+
+    def test_rewritten_entry_is_counted_once(self):
+        cache = DiskCache(self.cache_dir)
+        cache.store(self.image_path, ("a",), np.zeros(1000, np.uint8))
+        cache.store(self.image_path, ("a",), np.zeros(1000, np.uint8))
+        self.assertEqual(
+            sum(size for _, size, _ in cache._entries()), cache.current_bytes
+        )
+
+    def test_threads_share_a_capped_cache(self):
+        cache = DiskCache(self.cache_dir, max_bytes=20_000)
+
+        def store(index):
+            cache.store(
+                self.image_path, (index,), np.zeros(1000, np.uint8)
+            )
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(store, range(200)))
+        on_disk = sum(size for _, size, _ in cache._entries())
+        self.assertEqual(on_disk, cache.current_bytes)
+        self.assertLessEqual(on_disk, 20_000)
+
+    def test_refresh_counts_entries_of_other_processes(self):
+        cache = DiskCache(self.cache_dir)
+        copied = deepcopy(cache)
+        copied.store(self.image_path, ("a",), np.zeros(1000, np.uint8))
+        self.assertEqual(0, cache.current_bytes)
+        cache.refresh()
+        self.assertEqual(copied.current_bytes, cache.current_bytes)
+
+
+class TestMemoryCache(unittest.TestCase):
+    def test_lazy_dataset_counters(self):
+        dataset = RegressionDataset(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=False,
+            lazy=True,
+            memory_cache_bytes=10_000_000,
+        )
+        first = dataset[0]
+        second = dataset[0]
+        self.assertTrue(np.array_equal(first, second))
+        info = dataset.cache_info()
+        self.assertEqual(1, info["hits"])
+        self.assertEqual(1, info["misses"])
+        self.assertEqual(first.nbytes, info["current_bytes"])
+
+    def test_byte_budget_eviction(self):
+        cache = MemoryCache(max_bytes=250)
+        cache.put("a", np.zeros(100, np.uint8))
+        cache.put("b", (np.zeros(100, np.uint8), 22050))
+        cache.get("a")
+        cache.put("c", np.zeros(100, np.uint8))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(1, cache.evictions)
+        self.assertEqual(200, cache.current_bytes)
+        cache.put("d", np.zeros(300, np.uint8))
+        self.assertIsNone(cache.get("d"))
+
+    def test_copy_starts_empty(self):
+        dataset = RegressionDataset(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=False,
+            lazy=True,
+            memory_cache_bytes=10_000_000,
+        )
+        dataset[0]
+        copied = deepcopy(dataset)
+        self.assertEqual(0, copied.cache_info()["entries"])
+
+
+class TestZeroCopy(unittest.TestCase):
+    def setUp(self):
+        self.dataset = RegressionDataset(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=True,
+            csv_path="regression_data/poster.csv",
+            zero_copy=True,
+        )
+
+    def test_returns_read_only_view(self):
+        image, label = self.dataset[0]
+        self.assertFalse(image.flags.writeable)
+        self.assertTrue(np.shares_memory(image, self.dataset.data[0]))
+        self.assertEqual(self.dataset.labels[0], label)
+        with self.assertRaises(ValueError):
+            image[0, 0, 0] = 0
+
+    def test_writable_copies_on_write(self):
+        image, _ = self.dataset[0]
+        copy = Dataset.writable(image)
+        copy[0, 0, 0] = 1
+        self.assertFalse(np.shares_memory(copy, self.dataset.data[0]))
+        self.assertIs(copy, Dataset.writable(copy))
+
+    def test_latency_benchmark(self):
+        latencies = getitem_latency(self.dataset, repeats=1)
+        self.assertGreater(latencies["copy"], 0)
+        self.assertTrue(self.dataset.zero_copy)
+
+
+class TestShards(unittest.TestCase):
+    def setUp(self):
+        self.shard_dir = tempfile.mkdtemp()
+        self.dataset = RegressionDataset(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=True,
+            csv_path="regression_data/poster.csv",
+            lazy=True,
+        )
+        self.names = write_shards(
+            self.dataset, self.shard_dir, shard_bytes=5_000_000
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.shard_dir)
+
+    def test_round_trip(self):
+        shards = ShardDataset(self.shard_dir)
+        self.assertGreater(len(self.names), 1)
+        self.assertEqual(len(self.dataset), len(shards))
+        for index in (0, 37, len(shards) - 1):
+            image, label = shards[index]
+            expected_image, expected_label = self.dataset[index]
+            self.assertTrue(np.array_equal(expected_image, image))
+            self.assertAlmostEqual(expected_label, label)
+
+    def test_zero_copy_reads_mapped_buffer(self):
+        shards = ShardDataset(self.shard_dir, labels=False, zero_copy=True)
+        image = shards[3]
+        self.assertIsInstance(image, np.memmap)
+        self.assertFalse(image.flags.writeable)
+        copied = deepcopy(shards)
+        self.assertTrue(np.array_equal(image, copied[3]))
+
+    def test_train_test_split_selects_shard_rows(self):
+        shards = ShardDataset(self.shard_dir)
+        split = int(len(shards) * 0.8)
+        train_data, train_labels, test_data, test_labels = (
+            shards.train_test_split(0.8)
+        )
+        self.assertEqual(split, len(train_data))
+        self.assertEqual(len(shards) - split, len(test_data))
+        np.testing.assert_array_equal(shards.labels[split:], test_labels)
+        np.testing.assert_array_equal(shards[split][0], test_data[0])
+        selected = shards.data[[5, 2]][::-1]
+        np.testing.assert_array_equal(shards.data[2], selected[0])
+        np.testing.assert_array_equal(shards.labels[[2, 5]], selected.labels())
+
+    def test_audio_round_trip(self):
+        audio = RegressionDataset(
+            data_path="animal_data/cat",
+            data_type="audio",
+            labels=False,
+            lazy=True,
+        )
+        audio.data = audio.data[:3]
+        audio_dir = os.path.join(self.shard_dir, "audio")
+        write_shards(audio, audio_dir)
+        shards = ShardDataset(audio_dir, labels=False)
+        series, sampling_rate = shards[2]
+        self.assertEqual(audio[2][1], sampling_rate)
+        self.assertTrue(np.array_equal(audio[2][0], series))
+
+
+class TestStreamingDataset(unittest.TestCase):
+    def test_csv_stream_matches_dataset(self):
+        dataset = RegressionDataset(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=True,
+            csv_path="regression_data/poster.csv",
+            lazy=True,
+        )
+        stream = StreamingDataset(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=True,
+            dataset_format="csv",
+            csv_path="regression_data/poster.csv",
+            csv_chunksize=7,
+        )
+        streamed_labels = []
+        for index, (image, label) in enumerate(stream):
+            if index == 42:
+                self.assertTrue(np.array_equal(dataset[42][0], image))
+            streamed_labels.append(label)
+        self.assertEqual(list(dataset.labels), streamed_labels)
+
+    def test_shuffle_buffer(self):
+        kwargs = dict(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+            shuffle_buffer=64,
+            seed=3,
+        )
+        stream = StreamingDataset(**kwargs)
+        ordered = list(stream._walk())
+        shuffled = list(stream._shuffled(stream._walk(), (3, 0)))
+        self.assertNotEqual(ordered, shuffled)
+        self.assertEqual(sorted(ordered), sorted(shuffled))
+        other = StreamingDataset(**kwargs)
+        self.assertEqual(
+            shuffled, list(other._shuffled(other._walk(), (3, 0)))
+        )
+
+    def test_no_length(self):
+        stream = StreamingDataset(
+            data_path="chess_data", data_type="image", labels=False
+        )
+        with self.assertRaises(TypeError):
+            len(stream)
+
+
+class TestDirectoryScanner(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self.data_root = os.path.join(self.root, "data")
+        for class_name in ("Bishop", "King"):
+            class_path = os.path.join(self.data_root, class_name)
+            os.makedirs(class_path)
+            source = os.path.join("chess_data", class_name)
+            for name in sorted(os.listdir(source))[:3]:
+                shutil.copy(os.path.join(source, name), class_path)
+            open(os.path.join(class_path, "notes.txt"), "w").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_only_changed_folders_are_rescanned(self):
+        scanner = DirectoryScanner(self.data_root, self.manifest_path)
+        first = scanner.scan()
+        self.assertEqual(6, len(first))
+        self.assertEqual(["Bishop", "King"], sorted(scanner.rescanned))
+
+        second = DirectoryScanner(self.data_root, self.manifest_path)
+        self.assertEqual(first, second.scan())
+        self.assertEqual([], second.rescanned)
+
+        king = os.path.join(self.data_root, "King")
+        shutil.copy(first[0][0], os.path.join(king, "extra.jpg"))
+        third = DirectoryScanner(self.data_root, self.manifest_path)
+        self.assertEqual(7, len(third.scan()))
+        self.assertEqual(["King"], third.rescanned)
+
+    def test_dataset_with_manifest(self):
+        kwargs = dict(
+            data_path=self.data_root,
+            data_type="image",
+            labels=True,
+            dataset_format="hierarchical",
+            lazy=True,
+        )
+        plain = ClassificationDataset(**kwargs)
+        cached = ClassificationDataset(
+            manifest_path=self.manifest_path, **kwargs
+        )
+        again = ClassificationDataset(
+            manifest_path=self.manifest_path, **kwargs
+        )
+        self.assertEqual(plain.data, cached.data)
+        self.assertEqual(plain.labels, again.labels)
+        self.assertEqual(len(plain.data), len(plain.labels))
+
+
+class TestDecodeHints(unittest.TestCase):
+    def setUp(self):
+        kwargs = dict(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=False,
+        )
+        self.lazy = RegressionDataset(lazy=True, **kwargs)
+        self.eager = RegressionDataset(**kwargs)
+
+    def test_fused_crop_matches_crop_after_decode(self):
+        crop = CenterCrop(height=120, width=90)
+        fused = crop(self.lazy)
+        after = crop(self.eager)
+        self.assertFalse(fused.lazy)
+        for fused_image, image in zip(fused.data, after.data):
+            self.assertTrue(np.array_equal(image, fused_image))
+            self.assertEqual((120, 90, 3), fused_image.shape)
+        self.assertEqual({}, self.lazy._decode_hints)
+
+    def test_pipeline_applies_remaining_steps(self):
+        pipeline = SequentialPreprocessing(
+            CenterCrop(height=50, width=60),
+            RandomPatching(height=5, width=5, color="black"),
+        )
+        processed = pipeline(self.lazy)
+        self.assertEqual((50, 60, 3), processed[0].shape)
+        self.assertTrue((processed[0] == 0).all(axis=2).any())
+
+    def test_fused_decode_uses_less_memory(self):
+        results = decode_benchmark(self.lazy, CenterCrop(height=50, width=50))
+        self.assertLess(
+            results["fused"]["peak_bytes"], results["full"]["peak_bytes"]
+        )
+
+
+class TestAudioSampleRate(unittest.TestCase):
+    def setUp(self):
+        self.dataset = RegressionDataset(
+            data_path="animal_data/cat",
+            data_type="audio",
+            labels=False,
+            lazy=True,
+            sample_rate="native",
+        )
+        self.dataset.data = self.dataset.data[:3]
+
+    def test_native_rate(self):
+        series, sampling_rate = self.dataset[0]
+        info = sf.info(self.dataset.data[0])
+        self.assertEqual(info.samplerate, sampling_rate)
+        self.assertEqual(info.frames, len(series))
+
+    def test_resampler_is_fused_into_load(self):
+        resampled = SequentialPreprocessing(Resampler(8000))(self.dataset)
+        self.assertFalse(resampled.lazy)
+        for index, (series, sampling_rate) in enumerate(resampled.data):
+            duration = sf.info(self.dataset.data[index]).duration
+            self.assertEqual(8000, sampling_rate)
+            self.assertAlmostEqual(duration * 8000, len(series), delta=8)
+
+    def test_wrong_sample_rate(self):
+        with self.assertRaises(TypeError):
+            RegressionDataset(
+                data_path="animal_data/cat",
+                data_type="audio",
+                labels=False,
+                sample_rate="fast",
+            )
+
+
+class TestPartialAudioReads(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.dataset = RegressionDataset(
+            data_path="song_data/songs",
+            data_type="audio",
+            labels=False,
+            lazy=True,
+            cache_dir=self.cache_dir,
+        )
+        self.dataset.data = self.dataset.data[:3]
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_crop_and_resample_are_fused(self):
+        pipeline = SequentialPreprocessing(
+            RandomCropper(crop_duration=2), Resampler(resampling_rate=16000)
+        )
+        cropped = pipeline(self.dataset)
+        for series, sampling_rate in cropped.data:
+            self.assertEqual(16000, sampling_rate)
+            self.assertEqual(32000, len(series))
+        # random crops must not end up in the disk cache
+        self.assertEqual(0, self.dataset._disk_cache.current_bytes)
+
+    def test_long_crop_returns_whole_track(self):
+        cropped = RandomCropper(crop_duration=1000)(self.dataset)
+        series, sampling_rate = cropped.data[0]
+        self.assertEqual(22050, sampling_rate)
+        self.assertEqual(len(self.dataset[0][0]), len(series))
+
+
+class TestMetadata(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_image_headers(self):
+        dataset = ClassificationDataset(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+            dataset_format="hierarchical",
+            lazy=True,
+        )
+        metadata = dataset.metadata()
+        self.assertEqual(len(dataset), len(metadata["height"]))
+        self.assertEqual(dataset.data, metadata["path"].tolist())
+        height, width, bands = dataset[0][0].shape
+        self.assertEqual(height, metadata["height"][0])
+        self.assertEqual(width, metadata["width"][0])
+        self.assertIs(metadata, dataset.metadata())
+
+    def test_audio_headers_are_cached(self):
+        dataset = RegressionDataset(
+            data_path="song_data/songs",
+            data_type="audio",
+            labels=False,
+            lazy=True,
+        )
+        dataset.data = dataset.data[:3]
+        cache_path = os.path.join(self.cache_dir, "metadata.npz")
+        metadata = dataset.metadata(cache_path=cache_path)
+        self.assertTrue(os.path.exists(cache_path))
+        self.assertTrue(np.all(metadata["duration"] > 0))
+        np.testing.assert_allclose(
+            metadata["duration"],
+            metadata["frames"] / metadata["sampling_rate"],
+        )
+
+        dataset._metadata = None
+        cached = dataset.metadata(cache_path=cache_path)
+        np.testing.assert_array_equal(metadata["frames"], cached["frames"])
+
+    def test_changed_listing_invalidates_cache(self):
+        dataset = RegressionDataset(
+            data_path="song_data/songs",
+            data_type="audio",
+            labels=False,
+            lazy=True,
+        )
+        cache_path = os.path.join(self.cache_dir, "metadata.npz")
+        dataset.data = dataset.data[:2]
+        dataset.metadata(cache_path=cache_path)
+        dataset.data = dataset.data[:1]
+        metadata = dataset.metadata(cache_path=cache_path)
+        self.assertEqual(1, len(metadata["path"]))
+
+
+class TestCsvReader(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.folder, "songs.csv")
+        with open(self.csv_path, "w") as csv_file:
+            csv_file.write("ID,Genre,Year\n")
+            for index in range(1, 8):
+                csv_file.write(f"{index:03d}.mp3,rock,{1990 + index}\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_chunked_regression_labels(self):
+        dataset = RegressionDataset(
+            data_path="song_data/songs",
+            data_type="audio",
+            labels=True,
+            csv_path=self.csv_path,
+            lazy=True,
+            csv_chunksize=3,
+        )
+        self.assertEqual(7, len(dataset))
+        self.assertIsInstance(dataset.labels, np.ndarray)
+        self.assertEqual(np.float64, dataset.labels.dtype)
+        np.testing.assert_array_equal(np.arange(1991, 1998), dataset.labels)
+        self.assertEqual(
+            os.path.join("song_data/songs", "007.mp3"), dataset.data[-1]
+        )
+
+    def test_classification_labels_are_strings(self):
+        dataset = ClassificationDataset(
+            data_path="song_data/songs",
+            data_type="audio",
+            labels=True,
+            dataset_format="csv",
+            csv_path=self.csv_path,
+            lazy=True,
+            csv_chunksize=2,
+        )
+        self.assertEqual("U", dataset.labels.dtype.kind)
+        self.assertEqual("1991", dataset[0][1])
+
+    def test_invalid_chunksize(self):
+        with self.assertRaises(TypeError):
+            RegressionDataset(
+                data_path="song_data/songs",
+                data_type="audio",
+                labels=True,
+                csv_path=self.csv_path,
+                csv_chunksize=0,
+            )
+
+
+class TestLabelEncoder(unittest.TestCase):
+    def test_round_trip(self):
+        encoder = LabelEncoder()
+        codes = encoder.fit_transform(["rook", "king", "rook", "pawn"])
+        self.assertEqual(np.int16, codes.dtype)
+        np.testing.assert_array_equal([2, 0, 2, 1], codes)
+        np.testing.assert_array_equal(
+            ["rook", "king"], encoder.inverse_transform(codes[:2])
+        )
+        np.testing.assert_array_equal([1], encoder.transform(["pawn"]))
+        with self.assertRaises(TypeError):
+            encoder.transform(["queen"])
+
+    def test_encoded_dataset(self):
+        dataset = ClassificationDataset(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+            dataset_format="hierarchical",
+            lazy=True,
+            encode_labels=True,
+        )
+        names = ClassificationDataset(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+            dataset_format="hierarchical",
+            lazy=True,
+        ).labels
+        self.assertEqual(np.int16, dataset.labels.dtype)
+        np.testing.assert_array_equal(
+            names, dataset.label_encoder.inverse_transform(dataset.labels)
+        )
+        self.assertEqual(dataset.labels[0], dataset[0][1])
+
+    def test_label_batches_are_slices(self):
+        codes = LabelEncoder().fit_transform(list("abcabcab"))
+        batches = BatchLoader(codes, batch_size=3).create_batches()
+        self.assertIsInstance(batches[0], np.ndarray)
+        np.testing.assert_array_equal([0, 1], batches[-1])
+
+
+class TestContiguousStorage(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _write_images(self, shapes):
+        rng = np.random.default_rng(0)
+        for index, (height, width) in enumerate(shapes):
+            pixels = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+            Image.fromarray(pixels).save(
+                os.path.join(self.folder, f"{index}.png")
+            )
+
+    def _datasets(self):
+        kwargs = dict(data_path=self.folder, data_type="image", labels=False)
+        return (
+            RegressionDataset(contiguous=True, **kwargs),
+            RegressionDataset(**kwargs),
+        )
+
+    def test_same_shape_is_one_array(self):
+        self._write_images([(4, 5)] * 6)
+        contiguous, listed = self._datasets()
+        self.assertIsInstance(contiguous.data, np.ndarray)
+        self.assertEqual((6, 4, 5, 3), contiguous.data.shape)
+        for index in range(len(listed)):
+            np.testing.assert_array_equal(listed[index], contiguous[index])
+        train, test = contiguous.train_test_split(0.5)
+        self.assertTrue(np.shares_memory(train, contiguous.data))
+
+    def test_ragged_shapes(self):
+        self._write_images([(4, 5), (2, 3), (6, 1)])
+        contiguous, listed = self._datasets()
+        self.assertIsInstance(contiguous.data, RaggedArray)
+        for index in range(len(listed)):
+            np.testing.assert_array_equal(listed[index], contiguous[index])
+        train, test = contiguous.train_test_split(0.5, shuffle=True)
+        self.assertIsInstance(test, RaggedArray)
+        self.assertIs(contiguous.data.buffer, test.buffer)
+        self.assertEqual(3, len(train) + len(test))
+
+    def test_lazy_is_rejected(self):
+        with self.assertRaises(TypeError):
+            RegressionDataset(
+                data_path=self.folder,
+                data_type="image",
+                labels=False,
+                lazy=True,
+                contiguous=True,
+            )
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for index in range(4):
+            pixels = np.full((10, 10, 3), index, dtype=np.uint8)
+            Image.fromarray(pixels).save(
+                os.path.join(self.folder, f"{index}.png")
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_budget_spills_to_lazy(self):
+        kwargs = dict(data_path=self.folder, data_type="image", labels=False)
+        # with no room for data, the budget holds the paths and the headers
+        reserved = RegressionDataset(
+            max_memory_bytes=0, **kwargs
+        ).memory_usage()["total"]
+        dataset = RegressionDataset(
+            max_memory_bytes=reserved + 2 * 300 + 10, **kwargs
+        )
+        usage = dataset.memory_usage()
+        self.assertEqual(2, usage["eager"])
+        self.assertEqual(2, usage["lazy"])
+        self.assertLessEqual(usage["total"], usage["budget"])
+        self.assertEqual(
+            usage["total"],
+            usage["data"] + usage["labels"] + usage["overhead"],
+        )
+        full = RegressionDataset(
+            data_path=self.folder, data_type="image", labels=False
+        )
+        for index in range(len(full)):
+            np.testing.assert_array_equal(full[index], dataset[index])
+        cropped = CenterCrop(4, 4)(dataset)
+        self.assertEqual((4, 4, 3), cropped.data[-1].shape)
+
+    def test_budget_covers_labels_and_overhead(self):
+        dataset = RegressionDataset(
+            data_path="regression_data/poster_data",
+            data_type="image",
+            labels=True,
+            csv_path="regression_data/poster.csv",
+            max_memory_bytes=5_000_000,
+        )
+        usage = dataset.memory_usage()
+        self.assertGreater(usage["eager"], 0)
+        self.assertGreater(usage["labels"] + usage["overhead"], 0)
+        self.assertLessEqual(usage["total"], 5_000_000)
+
+    def test_spilled_samples_use_the_disk_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            dataset = RegressionDataset(
+                data_path=self.folder,
+                data_type="image",
+                labels=False,
+                max_memory_bytes=0,
+                cache_dir=cache_dir,
+            )
+            usage = dataset.memory_usage()
+            self.assertEqual(0, usage["data"])
+            self.assertEqual(4, usage["cached"])
+        finally:
+            shutil.rmtree(cache_dir)
+
+
+class TestSubsetSplits(unittest.TestCase):
+    def setUp(self):
+        self.dataset = ClassificationDataset(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+            dataset_format="hierarchical",
+            lazy=True,
+        )
+
+    def test_split_is_lazy_view(self):
+        train, test = self.dataset.split(0.75, shuffle=True, seed=1)
+        self.assertIsInstance(train, Subset)
+        self.assertEqual(len(self.dataset), len(train) + len(test))
+        self.assertEqual(
+            len(self.dataset),
+            len(np.union1d(train.indices, test.indices)),
+        )
+        index = int(test.indices[0])
+        self.assertEqual(self.dataset.labels[index], test[0][1])
+        np.testing.assert_array_equal(self.dataset[index][0], test[0][0])
+        nested = Subset(test, [0])
+        self.assertIs(self.dataset, nested.dataset)
+        self.assertEqual(index, nested.indices[0])
+
+    def test_stratified_split_keeps_proportions(self):
+        train, test = self.dataset.stratified_split(0.5, seed=0)
+        labels = np.asarray(self.dataset.labels)
+        for label in np.unique(labels):
+            count = np.count_nonzero(labels == label)
+            train_count = np.count_nonzero(np.asarray(train.labels) == label)
+            self.assertEqual(round(count * 0.5), train_count)
+
+    def test_k_fold_covers_every_index_once(self):
+        folds = self.dataset.k_fold(4, shuffle=True, seed=0, stratified=True)
+        tests = np.concatenate([test.indices for _, test in folds])
+        np.testing.assert_array_equal(
+            np.arange(len(self.dataset)), np.sort(tests)
+        )
+        for train, test in folds:
+            overlap = np.intersect1d(train.indices, test.indices)
+            self.assertEqual(0, len(overlap))
+        with self.assertRaises(TypeError):
+            self.dataset.k_fold(1)
+
+    def test_train_test_split_returns_labels(self):
+        self.dataset.data = self.dataset.data[:4]
+        self.dataset.labels = self.dataset.labels[:4]
+        _, _, _, test_labels = self.dataset.train_test_split(0.5)
+        self.assertEqual(self.dataset.labels[2:], test_labels)
+
+
+class TestAsyncAccess(unittest.TestCase):
+    def setUp(self):
+        self.dataset = ClassificationDataset(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+            dataset_format="hierarchical",
+            lazy=True,
+            max_concurrency=4,
+        )
+        self.dataset.data = self.dataset.data[:6]
+        self.dataset.labels = self.dataset.labels[:6]
+
+    def test_aget_and_batch(self):
+        async def fetch():
+            single = await self.dataset.aget(2)
+            batch = await self.dataset.aget_batch([3, 1])
+            return single, batch
+
+        single, batch = asyncio.run(fetch())
+        np.testing.assert_array_equal(self.dataset[2][0], single[0])
+        self.assertEqual(self.dataset.labels[3], batch[0][1])
+        self.assertEqual(self.dataset.labels[1], batch[1][1])
+
+    def test_async_for_keeps_order(self):
+        async def collect():
+            return [label async for _, label in self.dataset]
+
+        self.assertEqual(self.dataset.labels, asyncio.run(collect()))
+        # the executor is not copied along with the dataset
+        self.assertIsNone(deepcopy(self.dataset)._async_executor)
+
+    def test_close_stops_the_threads(self):
+        with self.dataset as dataset:
+            asyncio.run(dataset.aget(0))
+            executor = dataset._async_executor
+            self.assertIsNotNone(executor)
+        self.assertIsNone(self.dataset._async_executor)
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+        # a later async call starts new threads
+        asyncio.run(self.dataset.aget(0))
+        self.dataset.close()
+
+    def test_streaming_async_for(self):
+        dataset = StreamingDataset(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+        )
+
+        async def count():
+            total = 0
+            async for _ in dataset:
+                total += 1
+                if total == 3:
+                    break
+            return total
+
+        self.assertEqual(3, asyncio.run(count()))
+
+
+class TestPrefetchingBatchLoader(unittest.TestCase):
+    def setUp(self):
+        self.dataset = ClassificationDataset(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+            dataset_format="hierarchical",
+            lazy=True,
+        )
+        self.dataset.data = self.dataset.data[:7]
+        self.dataset.labels = self.dataset.labels[:7]
+
+    def _labels(self, batches):
+        return [[label for _, label in batch] for batch in batches]
+
+    def test_workers_keep_order(self):
+        expected = self._labels(
+            BatchLoader(self.dataset, batch_size=2).create_batches()
+        )
+        for executor in ["thread", "process"]:
+            loader = BatchLoader(
+                self.dataset,
+                batch_size=2,
+                num_workers=2,
+                prefetch_factor=1,
+                executor=executor,
+            )
+            self.assertEqual(expected, self._labels(loader.create_batches()))
+            report = loader.load_report()
+            self.assertEqual(4, report["batches"])
+            self.assertGreaterEqual(report["wait_seconds"], 0.0)
+
+    def test_shuffle_is_a_permutation(self):
+        np.random.seed(0)
+        loader = BatchLoader(
+            np.arange(9), batch_size=4, shuffle=True, num_workers=3
+        )
+        batches = loader.create_batches()
+        self.assertEqual([4, 4, 1], [len(batch) for batch in batches])
+        np.testing.assert_array_equal(
+            np.arange(9), np.sort(np.concatenate(batches))
+        )
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            BatchLoader(self.dataset, num_workers=-1)
+        with self.assertRaises(NameError):
+            BatchLoader(self.dataset, num_workers=1, executor="fiber")
+
+
+class TestCollator(unittest.TestCase):
+    def test_stack_reuses_buffer(self):
+        images = [np.full((2, 3, 3), i, dtype=np.uint8) for i in range(5)]
+        items = [(image, index) for index, image in enumerate(images)]
+        loader = BatchLoader(items, batch_size=2, collator=Collator())
+        batches = iter(loader)
+        first_images, first_labels = next(batches)
+        self.assertEqual((2, 2, 3, 3), first_images.shape)
+        np.testing.assert_array_equal([0, 1], first_labels)
+        second_images, _ = next(batches)
+        self.assertTrue(np.shares_memory(first_images, second_images))
+        last_images, last_labels = next(batches)
+        self.assertEqual((1, 2, 3, 3), last_images.shape)
+        np.testing.assert_array_equal([4], last_labels)
+
+    def test_create_batches_keeps_every_batch(self):
+        images = [np.full((2, 3, 3), i, dtype=np.uint8) for i in range(5)]
+        items = [(image, index) for index, image in enumerate(images)]
+        loader = BatchLoader(items, batch_size=2, collator=Collator())
+        batches = loader.create_batches()
+        for (batch_images, batch_labels), expected in zip(
+            batches, [[0, 1], [2, 3], [4]]
+        ):
+            np.testing.assert_array_equal(expected, batch_labels)
+            np.testing.assert_array_equal(expected, batch_images[:, 0, 0, 0])
+
+    def test_stack_rejects_ragged_images(self):
+        with self.assertRaises(TypeError):
+            Collator()([np.zeros((2, 2, 3)), np.zeros((3, 2, 3))])
+        with self.assertRaises(NameError):
+            Collator(mode="concat")
+
+    def test_pad_audio(self):
+        collator = Collator(mode="pad", pad_value=-1.0)
+        batch = [
+            ((np.ones(3, dtype=np.float32), 22050), "a"),
+            ((np.ones(5, dtype=np.float32), 22050), "b"),
+        ]
+        audio, lengths, sampling_rates, labels = collator(batch)
+        self.assertEqual((2, 5), audio.shape)
+        np.testing.assert_array_equal([3, 5], lengths)
+        np.testing.assert_array_equal([22050, 22050], sampling_rates)
+        np.testing.assert_array_equal(["a", "b"], labels)
+        self.assertEqual(-1.0, audio[0, 4])
+        audio, lengths, _ = collator([(np.ones(2, dtype=np.float32), 8000)])
+        self.assertEqual((1, 2), audio.shape)
+
+
+class TestBucketBatchSampler(unittest.TestCase):
+    def setUp(self):
+        self.lengths = np.random.default_rng(0).integers(1, 1000, 200)
+
+    def test_batches_cover_every_sample_within_limits(self):
+        sampler = BucketBatchSampler(
+            self.lengths, max_samples_per_batch=16, max_tokens=4000, seed=3
+        )
+        batches = list(sampler)
+        np.testing.assert_array_equal(
+            np.arange(200), np.sort(np.concatenate(batches))
+        )
+        for batch in batches:
+            self.assertLessEqual(len(batch), 16)
+            if len(batch) > 1:
+                longest = self.lengths[batch].max()
+                self.assertLessEqual(len(batch) * longest, 4000)
+
+    def test_padding_drops_and_epochs_differ(self):
+        sampler = BucketBatchSampler(
+            self.lengths, max_samples_per_batch=10, seed=0
+        )
+        unbucketed = BucketBatchSampler(
+            self.lengths, max_samples_per_batch=10, num_buckets=1, seed=0
+        )
+        self.assertLess(
+            sampler.padding_overhead(), unbucketed.padding_overhead() / 2
+        )
+        first = [batch.tolist() for batch in sampler]
+        second = [batch.tolist() for batch in sampler]
+        self.assertNotEqual(first, second)
+        with self.assertRaises(TypeError):
+            BucketBatchSampler(self.lengths)
+
+    def test_loader_with_dataset_lengths(self):
+        dataset = RegressionDataset(
+            data_path="song_data/songs",
+            data_type="audio",
+            labels=False,
+            lazy=True,
+        )
+        dataset.data = dataset.data[:4]
+        sampler = BucketBatchSampler.from_dataset(
+            dataset, max_samples_per_batch=2, num_buckets=2, seed=0
+        )
+        loader = BatchLoader(
+            dataset, batch_sampler=sampler, collator=Collator(mode="pad")
+        )
+        self.assertEqual(2, len(loader))
+        for audio, lengths, _ in loader:
+            self.assertEqual(lengths.max(), audio.shape[1])
+
+
+class TestDistributedBatchLoader(unittest.TestCase):
+    def _rank_batches(self, world_size, **kwargs):
+        return [
+            BatchLoader(
+                np.arange(10),
+                batch_size=2,
+                rank=rank,
+                world_size=world_size,
+                seed=7,
+                **kwargs,
+            ).create_batches()
+            for rank in range(world_size)
+        ]
+
+    def test_ranks_are_disjoint_and_equal(self):
+        ranks = self._rank_batches(3, shuffle=True, drop_uneven=True)
+        seen = np.concatenate([np.concatenate(batches) for batches in ranks])
+        self.assertEqual(9, len(seen))
+        self.assertEqual(9, len(np.unique(seen)))
+        self.assertEqual(1, len({len(batches) for batches in ranks}))
+
+    def test_padding_repeats_samples(self):
+        ranks = self._rank_batches(3)
+        seen = np.concatenate([np.concatenate(batches) for batches in ranks])
+        self.assertEqual(12, len(seen))
+        np.testing.assert_array_equal(np.arange(10), np.unique(seen))
+
+    def test_epochs_are_deterministic(self):
+        first = BatchLoader(np.arange(10), shuffle=True, seed=1)
+        second = BatchLoader(np.arange(10), shuffle=True, seed=1)
+        epoch_0 = first.create_batches()[0].tolist()
+        epoch_1 = first.create_batches()[0].tolist()
+        self.assertNotEqual(epoch_0, epoch_1)
+        second.set_epoch(1)
+        self.assertEqual(epoch_1, second.create_batches()[0].tolist())
+
+    def test_unseeded_batch_samplers_share_the_seed(self):
+        lengths = np.random.default_rng(0).integers(1, 100, 40)
+        seen = []
+        for rank in range(2):
+            loader = BatchLoader(
+                np.arange(40),
+                batch_sampler=BucketBatchSampler(
+                    lengths, max_samples_per_batch=4
+                ),
+                rank=rank,
+                world_size=2,
+                seed=5,
+            )
+            seen.append(np.concatenate(loader.create_batches()))
+        self.assertEqual(0, len(np.intersect1d(seen[0], seen[1])))
+        np.testing.assert_array_equal(
+            np.arange(40), np.sort(np.concatenate(seen))
+        )
+
+    def test_invalid_rank(self):
+        with self.assertRaises(TypeError):
+            BatchLoader(np.arange(4), rank=2, world_size=2, seed=0)
+        with self.assertRaises(TypeError):
+            BatchLoader(np.arange(4), rank=0, world_size=2)
+
+
+class TestResumableBatchLoader(unittest.TestCase):
+    def test_resume_mid_epoch(self):
+        loader = BatchLoader(np.arange(20), batch_size=3, shuffle=True)
+        loader.create_batches()
+        expected = [batch.tolist() for batch in loader]
+        loader.set_epoch(1)
+        iterator = iter(loader)
+        next(iterator)
+        next(iterator)
+        state = loader.state_dict()
+        self.assertEqual(1, state["epoch"])
+        self.assertEqual(2, state["cursor"])
+
+        restarted = BatchLoader(
+            np.arange(20), batch_size=3, shuffle=True, num_workers=2
+        )
+        restarted.load_state_dict(state)
+        self.assertEqual(expected[2:], [b.tolist() for b in restarted])
+        # the following epoch reshuffles without a new loader
+        self.assertEqual(2, restarted.state_dict()["epoch"])
+        self.assertNotEqual(expected, [b.tolist() for b in restarted])
+
+    def test_resume_with_batch_sampler(self):
+        lengths = np.arange(1, 31)
+        loader = BatchLoader(
+            np.arange(30),
+            batch_sampler=BucketBatchSampler(lengths, max_tokens=100),
+        )
+        remaining = [batch.tolist() for batch in loader][1:]
+        loader.set_epoch(0)
+        iterator = iter(loader)
+        next(iterator)
+        state = loader.state_dict()
+
+        restarted = BatchLoader(
+            np.arange(30),
+            batch_sampler=BucketBatchSampler(lengths, max_tokens=100),
+        )
+        restarted.load_state_dict(state)
+        self.assertEqual(remaining, [batch.tolist() for batch in restarted])
+
+    def test_state_of_other_rank_is_rejected(self):
+        state = BatchLoader(np.arange(4), world_size=2, seed=0).state_dict()
+        with self.assertRaises(TypeError):
+            BatchLoader(np.arange(4)).load_state_dict(state)
+
+
+class TestSamplers(unittest.TestCase):
+    def setUp(self):
+        # 90 samples of class "a", 10 of class "b"
+        self.labels = np.array(["a"] * 90 + ["b"] * 10)
+
+    def test_random_and_weighted_samplers(self):
+        sampler = RandomSampler(50, seed=1)
+        np.testing.assert_array_equal(
+            np.arange(50), np.sort(sampler.indices(0))
+        )
+        np.testing.assert_array_equal(sampler.indices(2), sampler.indices(2))
+        self.assertFalse(
+            np.array_equal(sampler.indices(0), sampler.indices(1))
+        )
+        with self.assertRaises(TypeError):
+            RandomSampler(5, num_samples=10)
+
+        weighted = WeightedRandomSampler([0, 1, 0, 3], 1000, seed=0)
+        indices = weighted.indices(0)
+        self.assertEqual(set(indices.tolist()), {1, 3})
+        self.assertGreater(np.sum(indices == 3), 2 * np.sum(indices == 1))
+        with self.assertRaises(TypeError):
+            WeightedRandomSampler([0, 0])
+
+    def test_class_balanced_sampler_with_loader(self):
+        sampler = ClassBalancedSampler(self.labels, num_samples=2000, seed=0)
+        loader = BatchLoader(self.labels, batch_size=100, sampler=sampler)
+        self.assertEqual(len(loader), 20)
+        drawn = np.concatenate(list(loader))
+        self.assertAlmostEqual(np.mean(drawn == "b"), 0.5, delta=0.05)
+        with self.assertRaises(TypeError):
+            BatchLoader(self.labels, shuffle=True, sampler=sampler)
+
+    def test_unseeded_samplers_share_the_seed(self):
+        ranks = [
+            np.concatenate(
+                BatchLoader(
+                    np.arange(10),
+                    batch_size=2,
+                    rank=rank,
+                    world_size=2,
+                    seed=0,
+                    sampler=RandomSampler(10),
+                ).create_batches()
+            )
+            for rank in range(2)
+        ]
+        np.testing.assert_array_equal(
+            np.arange(10), np.sort(np.concatenate(ranks))
+        )
+
+    def test_infinite_sampler_continues_and_resumes(self):
+        sampler = InfiniteSampler(RandomSampler(10, seed=4))
+        loader = BatchLoader(np.arange(10), batch_size=4, sampler=sampler)
+        with self.assertRaises(TypeError):
+            len(loader)
+        iterator = iter(loader)
+        batches = [next(iterator) for _ in range(5)]
+        # the stream runs over the end of an epoch into the next one
+        stream = np.concatenate(batches)
+        np.testing.assert_array_equal(np.sort(stream[:10]), np.arange(10))
+        np.testing.assert_array_equal(np.sort(stream[10:20]), np.arange(10))
+
+        state = loader.state_dict()
+        restarted = BatchLoader(
+            np.arange(10),
+            batch_size=4,
+            sampler=InfiniteSampler(RandomSampler(10)),
+        )
+        restarted.load_state_dict(state)
+        np.testing.assert_array_equal(next(iterator), next(restarted))
+
+
+class TestBatchedAccess(unittest.TestCase):
+    def setUp(self):
+        self.dataset = ClassificationDataset(
+            data_path="chess_data",
+            data_type="image",
+            labels=True,
+            dataset_format="hierarchical",
+            lazy=True,
+        )
+        self.dataset.data = self.dataset.data[:6]
+        self.dataset.labels = self.dataset.labels[:6]
+
+    def test_get_batch_matches_getitem(self):
+        reads = []
+        read_data_point = self.dataset._read_data_point
+
+        def record(path):
+            reads.append(path)
+            return read_data_point(path)
+
+        self.dataset._read_data_point = record
+        batch = self.dataset.get_batch([4, 1, 4])
+        # the unique files of the batch are read once, sorted by path
+        self.assertEqual(2, len(reads))
+        self.assertEqual(sorted(reads), reads)
+        for (data_point, label), index in zip(batch, [4, 1, 4]):
+            expected, expected_label = self.dataset[index]
+            np.testing.assert_array_equal(expected, data_point)
+            self.assertEqual(expected_label, label)
+        # repeated indices get their own arrays
+        self.assertIsNot(batch[0][0], batch[2][0])
+
+        subset = Subset(self.dataset, [5, 4, 1])
+        np.testing.assert_array_equal(
+            subset.get_batch([1])[0][0], batch[0][0]
+        )
+
+    def test_loader_reads_batches_from_dataset(self):
+        loader = BatchLoader(self.dataset, batch_size=4)
+        batches = loader.create_batches()
+        self.assertEqual([4, 2], [len(batch) for batch in batches])
+        self.assertEqual(
+            list(self.dataset.labels),
+            [label for batch in batches for _, label in batch],
+        )
+
+    def test_disk_cache_hits_are_copied(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            self.dataset._disk_cache = DiskCache(cache_dir)
+            self.dataset.get_batch([0])
+            data_point, _ = self.dataset.get_batch([0])[0]
+            self.assertTrue(data_point.flags.writeable)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_zero_copy_batches_are_read_only(self):
+        self.dataset.zero_copy = True
+        data_point, _ = self.dataset.get_batch([0])[0]
+        self.assertFalse(data_point.flags.writeable)
+
+
+class TestBatchedPreprocessing(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.batch = rng.integers(1, 255, (5, 20, 30, 3), dtype=np.uint8)
+
+    def test_center_crop_is_one_slice(self):
+        crop = CenterCrop(10, 12)
+        cropped = crop.apply_batch(self.batch)
+        self.assertEqual((5, 10, 12, 3), cropped.shape)
+        self.assertTrue(np.shares_memory(cropped, self.batch))
+        for image, cropped_image in zip(self.batch, cropped):
+            np.testing.assert_array_equal(
+                crop._center_crop(image), cropped_image
+            )
+        # ragged images fall back to one image at a time
+        ragged = crop.apply_batch([self.batch[0], self.batch[1, :15, :25]])
+        self.assertEqual([(10, 12, 3)] * 2, [x.shape for x in ragged])
+
+    def test_random_patching_masks_every_image(self):
+        np.random.seed(0)
+        patched = RandomPatching(4, 5, "red").apply_batch(self.batch)
+        self.assertFalse(np.shares_memory(patched, self.batch))
+        red = (patched == [255, 0, 0]).all(axis=3)
+        for image_mask in red:
+            rows, columns = np.nonzero(image_mask)
+            self.assertEqual(20, len(rows))
+            self.assertEqual(4, rows.max() - rows.min() + 1)
+            self.assertEqual(5, columns.max() - columns.min() + 1)
+        unchanged = ~red[:, :, :, np.newaxis]
+        np.testing.assert_array_equal(
+            np.where(unchanged, self.batch, 0), np.where(unchanged, patched, 0)
+        )
+
+    def test_audio_steps_and_pipelines_take_batches(self):
+        samples = [
+            (np.ones(22050, dtype=np.float32), 22050),
+            (np.ones(44100, dtype=np.float32), 22050),
+        ]
+        resampled = Resampler(11025).apply_batch(samples)
+        self.assertEqual([11025, 11025], [rate for _, rate in resampled])
+        self.assertEqual(11025, len(resampled[0][0]))
+        cropped = RandomCropper(0.5).apply_batch(samples)
+        self.assertEqual([11025, 11025], [len(x) for x, _ in cropped])
+
+        pipeline = SequentialPreprocessing(
+            CenterCrop(10, 12), RandomPatching(2, 2, "black")
+        )
+        self.assertEqual(
+            (5, 10, 12, 3), pipeline.apply_batch(self.batch).shape
+        )
+        self.assertEqual(
+            (10, 12, 3), pipeline.apply_batch([self.batch[0]])[0].shape
+        )
+
+    def test_contiguous_dataset_uses_batch_path(self):
+        folder = tempfile.mkdtemp()
+        try:
+            for index, image in enumerate(self.batch):
+                Image.fromarray(image).save(
+                    os.path.join(folder, f"{index}.png")
+                )
+            dataset = RegressionDataset(
+                data_path=folder,
+                data_type="image",
+                labels=False,
+                contiguous=True,
+            )
+            cropped = CenterCrop(8, 8)(dataset)
+            self.assertIsInstance(cropped.data, np.ndarray)
+            self.assertEqual((5, 8, 8, 3), cropped.data.shape)
+            patched = RandomPatching(2, 2, "black")(dataset)
+            self.assertEqual((5, 20, 30, 3), patched.data.shape)
+        finally:
+            shutil.rmtree(folder)
+
+
 if __name__ == "__main__":
     unittest.main()